@@ -1,10 +1,30 @@
+import os
+import time
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import streamlit.components.v1 as components
-import random
+
+from twin.core import (
+    WEAR_THRESHOLD_PRESSURE, OVERPRESSURE_THRESHOLD, OPTIMAL_PRESSURE_RANGE,
+    HIGH_MILEAGE_THRESHOLD, MILEAGE_ALERT_THRESHOLD,
+    CRITICAL_TEMP_THRESHOLD, OPTIMAL_TEMP_RANGE,
+    predict_wear_and_status, calculate_business_metrics,
+    simulate_tires, simulation_frame, default_lut,
+    LIMIT_LABELS, RemainingLifeEstimator, median_time_to_limit,
+    project_remaining_life, simulated_fleet_remaining_life,
+    PAGE_SIZE, RANKINGS, fleet_rows, fleet_snapshot, maintenance_due, page_of,
+    simulated_fleet_snapshot, worst_tires,
+    FleetHierarchy, load_layout, maintenance_savings, simulated_layout,
+)
+from twin.anomaly import DriftDetector
+from twin.assets import AssetServer, viewer_sources
+from twin.cache import CacheStats, LRUCache, data_version
+from twin.downsample import downsample_trace, points_for_width
+from twin.exporter import MetricsExporter, cache_families, drift_families, profiler_families, telemetry_families
+from twin.history import HistoryStore
+from twin.store import TelemetryStore
+from twin.ingest import TelemetryService
+from twin.profiling import Profiler
+from twin.viewer import TIRE_MATERIALS, twin_viewer, viewer_state
 
 # --- CONFIGURATION: Full Screen, No Scroll ---
 st.set_page_config(
@@ -14,164 +34,65 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+@st.cache_resource
+def render_profiler():
+    """Process-wide section timings; enabled with TWIN_PROFILE=1 or the metrics endpoint."""
+    enabled = os.environ.get("TWIN_PROFILE", "") not in ("", "0") or bool(os.environ.get("TWIN_METRICS_PORT"))
+    return Profiler(enabled=enabled)
+
+profiler = render_profiler()
+page_start = time.perf_counter()
+
 # --- 1. REALISTIC CONSTANTS & BUSINESS LOGIC ---
-# Tire pressure thresholds (REALISTIC ranges for heavy vehicles)
-WEAR_THRESHOLD_PRESSURE = 28.0  # Critical UNDER-inflation
-OVERPRESSURE_THRESHOLD = 38.0   # Critical OVER-inflation (would cause blowout)
-OPTIMAL_PRESSURE_RANGE = (30.0, 35.0)  # Ideal operating range
-PRESSURE_ALERT_THRESHOLD = 29.0  # Early warning for under-inflation
-OVERPRESSURE_ALERT = 36.0       # Early warning for over-inflation
-
-# Mileage thresholds (realistic for tire lifespan)
-HIGH_MILEAGE_THRESHOLD = 40000.0  # km - typical tire lifespan
-MILEAGE_ALERT_THRESHOLD = 35000.0  # Early warning
-
-# Temperature thresholds (REALISTIC for tire operation)
-CRITICAL_TEMP_THRESHOLD = 85.0  # °C - dangerous temperature (rubber degradation)
-TEMP_ALERT_THRESHOLD = 75.0     # °C - warning threshold
-OPTIMAL_TEMP_RANGE = (45.0, 70.0)  # Normal operating range
-
-# Business metrics (REALISTIC calculations)
-BASE_MAINTENANCE_COST = 1200    # $ per unplanned maintenance event
-TIRE_REPLACEMENT_COST = 800     # $ per tire
-DAILY_OPERATIONAL_COST = 1200   # $ per day of downtime (heavy equipment)
-CATASTROPHIC_FAILURE_COST = 5000 # $ for catastrophic failure (blowout + damage)
-
-def predict_wear_and_status(pressure, mileage, temp):
-    """REALISTIC multi-factor risk assessment"""
-    risk_factors = 0
-    critical_issues = []
-    
-    # PRESSURE ANALYSIS (FIXED)
-    if pressure < WEAR_THRESHOLD_PRESSURE:
-        risk_factors += 3  # Critical under-inflation
-        critical_issues.append("CRITICAL UNDER-INFLATION")
-    elif pressure > OVERPRESSURE_THRESHOLD:
-        risk_factors += 3  # Critical over-inflation (blowout risk)
-        critical_issues.append("CRITICAL OVER-INFLATION - BLOWOUT RISK")
-    elif pressure < PRESSURE_ALERT_THRESHOLD:
-        risk_factors += 2  # Warning under-inflation
-    elif pressure > OVERPRESSURE_ALERT:
-        risk_factors += 2  # Warning over-inflation
-    
-    # MILEAGE ANALYSIS
-    if mileage > HIGH_MILEAGE_THRESHOLD:
-        risk_factors += 2  # High mileage wear
-        critical_issues.append("END OF SERVICE LIFE")
-    elif mileage > MILEAGE_ALERT_THRESHOLD:
-        risk_factors += 1  # Warning mileage
-    
-    # TEMPERATURE ANALYSIS (FIXED)
-    if temp > CRITICAL_TEMP_THRESHOLD:
-        risk_factors += 3  # Critical temperature (rubber degradation)
-        critical_issues.append("CRITICAL TEMPERATURE - RUBBER DEGRADATION")
-    elif temp > TEMP_ALERT_THRESHOLD:
-        risk_factors += 2  # Warning temperature
-    
-    # Multi-factor risk assessment
-    if risk_factors >= 6 or critical_issues:
-        if "BLOWOUT RISK" in critical_issues or "RUBBER DEGRADATION" in critical_issues:
-            return "CRITICAL: IMMINENT FAILURE RISK", "red", "🛑"
-        else:
-            return "CRITICAL: MULTIPLE FAILURE FACTORS", "red", "🚨"
-    elif risk_factors >= 4:
-        return "HIGH RISK: MAINTENANCE REQUIRED", "orange", "⚠️"
-    elif risk_factors >= 2:
-        return "WARNING: ELEVATED RISK", "yellow", "🔶"
-    else:
-        return "NORMAL OPERATING STATE", "green", "✅"
-
-def calculate_business_metrics(pressure, mileage, temp, status_color):
-    """REALISTIC business metrics calculations"""
-    
-    # FUEL EFFICIENCY (FIXED - over-inflation should improve efficiency initially)
-    fuel_efficiency_impact = 0
-    if pressure < OPTIMAL_PRESSURE_RANGE[0]:
-        # Under-inflation: 0.5% fuel loss per PSI under optimal
-        fuel_efficiency_impact = -((OPTIMAL_PRESSURE_RANGE[0] - pressure) * 0.5)
-    elif pressure > OPTIMAL_PRESSURE_RANGE[1]:
-        # Over-inflation: slight improvement up to a point, then negative
-        over_pressure = pressure - OPTIMAL_PRESSURE_RANGE[1]
-        if over_pressure <= 3:  # Slight over-inflation can improve efficiency
-            fuel_efficiency_impact = min(2.0, over_pressure * 0.7)
-        else:  # Extreme over-inflation reduces efficiency
-            fuel_efficiency_impact = 2.0 - ((over_pressure - 3) * 1.5)
-    
-    # Temperature impact on fuel efficiency
-    if temp > OPTIMAL_TEMP_RANGE[1]:
-        temp_impact = -((temp - OPTIMAL_TEMP_RANGE[1]) * 0.2)  # High temp reduces efficiency
-        fuel_efficiency_impact += temp_impact
-    
-    # MAINTENANCE COST SAVINGS (FIXED - realistic values)
-    if status_color == "green":
-        maintenance_savings = 1800  # $ - preventive maintenance savings
-        risk_score = random.randint(15, 25)
-        uptime = 98.2
-    elif status_color == "yellow":
-        maintenance_savings = 2400  # $ - early detection savings
-        risk_score = random.randint(35, 50)
-        uptime = 96.5
-    elif status_color == "orange":
-        maintenance_savings = 3600  # $ - avoiding major repairs
-        risk_score = random.randint(60, 75)
-        uptime = 94.0
-    else:  # red/critical
-        maintenance_savings = 4800  # $ - preventing catastrophic failure
-        risk_score = random.randint(85, 98)
-        uptime = 89.0
-    
-    # Additional mileage impact
-    if mileage > HIGH_MILEAGE_THRESHOLD:
-        maintenance_savings += 800  # Additional savings from avoiding tire replacement
-        uptime -= 2.0
-    
-    return {
-        "uptime": round(uptime, 1),
-        "fuel_efficiency": round(fuel_efficiency_impact, 1),
-        "maintenance_savings": maintenance_savings,
-        "risk_score": risk_score
-    }
+# Thresholds, risk engine, business metrics and simulator live in twin/core.py
+
+@st.cache_resource
+def simulation_cache_stats():
+    """Hit/miss counts for generate_simulation_data (st.cache_data keeps none)."""
+    return CacheStats()
 
 @st.cache_data
 def generate_simulation_data():
     """Generates realistic simulation data with proper wear patterns."""
-    data = []
-    pressure_start = 33.5  # Start at optimal pressure
-    temp_start = 55.0      # Start at normal operating temp
-    mileage_start = 0
-    
-    # Realistic wear simulation
-    for i in range(150): 
-        # Pressure decreases gradually with some randomness
-        pressure_wear = random.uniform(0.08, 0.25)  # Realistic pressure loss per interval
-        if mileage_start > 25000:  # Increased wear after 25k km
-            pressure_wear *= 1.3
-        pressure_start -= pressure_wear
-        
-        # Temperature fluctuates based on mileage and pressure
-        temp_change = random.uniform(-2, 4)
-        if pressure_start < 30:  # Lower pressure increases temperature
-            temp_change += random.uniform(1, 3)
-        if mileage_start > 30000:  # Older tires run hotter
-            temp_change += random.uniform(0.5, 2)
-        temp_start = max(30, min(90, temp_start + temp_change))
-        
-        # Mileage accumulation
-        mileage_start += random.uniform(250, 600)  # Realistic distance intervals
-        
-        data.append((mileage_start, round(pressure_start, 2), round(temp_start, 1)))
-        
-        # Stop simulation if pressure critically low or temperature critically high
-        if pressure_start < WEAR_THRESHOLD_PRESSURE - 2 or temp_start > CRITICAL_TEMP_THRESHOLD + 5:
-            break 
-    
-    df = pd.DataFrame(data, columns=['Mileage (km)', 'Pressure (PSI)', 'Temperature (°C)'])
-    return df
-
-df_sim = generate_simulation_data()
+    simulation_cache_stats().record_miss()
+    # Single-tire run of the vectorized Monte Carlo engine (same wear rules)
+    return simulation_frame(simulate_tires(1))
+
+with profiler.section("engine.simulation_data"):
+    simulation_cache_stats().record_call()
+    df_sim = generate_simulation_data()
+    df_sim_version = data_version(*(df_sim[column].to_numpy() for column in df_sim.columns))
+
+@st.cache_resource
+def live_fleet_layout():
+    """Vehicle/axle layout of the live fleet and whether it is the simulated fallback."""
+    # TWIN_FLEET_LAYOUT points at the fleet's JSON mapping file (see twin.hierarchy.load_layout)
+    path = os.environ.get("TWIN_FLEET_LAYOUT")
+    if path:
+        return load_layout(path), False
+    # TWIN_MAX_TIRES sizes the per-tire arrays; raise it for fleets above 65,536 tires
+    return simulated_layout(int(os.environ.get("TWIN_MAX_TIRES", 65536))), True
+
+@st.cache_resource
+def telemetry_service():
+    """Shared UDP telemetry consumer, started once per server process."""
+    port = os.environ.get("TWIN_TELEMETRY_PORT")
+    if not port:
+        return None
+    # TWIN_HISTORY_DB keeps every reading in a local SQLite file for the trend chart
+    db_path = os.environ.get("TWIN_HISTORY_DB")
+    layout, _ = live_fleet_layout()
+    # Tire ids are positions in the layout, so it bounds the per-tire arrays
+    max_tires = int(os.environ.get("TWIN_MAX_TIRES", layout.n_tires))
+    if max_tires > layout.n_tires:
+        raise ValueError(f"TWIN_MAX_TIRES={max_tires} exceeds the {layout.n_tires:,} tires of the fleet layout")
+    return TelemetryService(port=int(port), max_tires=max_tires, history=HistoryStore(),
+                            drift=DriftDetector(max_tires), rul=RemainingLifeEstimator(max_tires),
+                            store=TelemetryStore(db_path) if db_path else None,
+                            hierarchy=FleetHierarchy(layout)).start()
 
 # --- 2. LIGHT THEME UI: Professional and High-Contrast (Sleek CSS) ---
-st.markdown("""
+PAGE_CSS = """
 <style>
 /* 1. BASE THEME: Light Gray Background, Compact Text */
 .main {
@@ -293,7 +214,9 @@ div.block-container {
     z-index: 2;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+with profiler.section("page.css"):
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # --- 3. COMPACT LAYOUT: Single Page, No Scroll ---
 header_col1, header_col2 = st.columns([3, 1])
@@ -311,64 +234,73 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.markdown('<div class="cyber-divider"></div>', unsafe_allow_html=True)
 
-# Get current status with realistic default values
-sim_mileage = 18500
-sim_pressure = 32.2
-sim_temp = 52.5
-
-# Main Dashboard Grid - Single View, No Scroll
-main_col1, main_col2, main_col3, main_col4 = st.columns([2.5, 1.3, 2.0, 1.5]) 
+@st.cache_resource
+def asset_server():
+    """Optional local asset server with immutable caching (TWIN_ASSET_PORT)."""
+    port = os.environ.get("TWIN_ASSET_PORT")
+    if not port:
+        return None
+    return AssetServer(port=int(port)).start()
+
+@st.cache_resource
+def risk_classifier():
+    """Slider classification: the precomputed lookup table with TWIN_RISK_LUT=1, else the rules."""
+    if os.environ.get("TWIN_RISK_LUT", "") in ("", "0"):
+        return predict_wear_and_status
+    return default_lut().predict
+
+# Fragments auto-refresh from the live feed while it is streaming
+LIVE_REFRESH_SECONDS = 1.0 if telemetry_service() is not None else None
+
+def live_reading_if_enabled():
+    """Latest live snapshot while the feed toggle is on, else None."""
+    live_feed = telemetry_service()
+    if live_feed is None or not st.session_state.get("use_live_feed", True):
+        return None
+    return live_feed.snapshot()
 
 # --- COLUMN 4: I/O SIMULATOR (COMPACT CONTROLS) ---
-with main_col4:
+def render_io_simulator(live_reading):
+    """Sliders (or the live feed's ``live_reading`` snapshot); returns mileage, pressure,
+    temperature and the live reading in use (None while the sliders drive the dashboard)."""
     st.markdown("### I/O SIMULATOR")
     st.caption("Test different operational scenarios")
     
+    # Live telemetry feed (enabled with TWIN_TELEMETRY_PORT)
+    live_feed = telemetry_service()
+    use_live = live_reading is not None and st.toggle(
+        "Live telemetry feed", value=True, key="use_live_feed",
+        help=f"UDP readings on port {live_feed.port if live_feed else ''}; turn off to use the sliders")
+    
     # REALISTIC slider ranges
-    sim_mileage = st.slider("Mileage (km)", 0, 50000, 18500, 500, 
+    sim_mileage = st.slider("Mileage (km)", 0, 50000, 18500, 500, disabled=use_live,
                            help="Typical tire lifespan: 40,000 km")
-    sim_pressure = st.slider("Pressure (PSI)", 25.0, 40.0, 32.2, 0.1,
+    sim_pressure = st.slider("Pressure (PSI)", 25.0, 40.0, 32.2, 0.1, disabled=use_live,
                             help="Optimal: 30-35 PSI, Critical: <28 PSI or >38 PSI")
-    sim_temp = st.slider("Temperature (°C)", 30.0, 90.0, 52.5, 0.5,
+    sim_temp = st.slider("Temperature (°C)", 30.0, 90.0, 52.5, 0.5, disabled=use_live,
                         help="Optimal: 45-70°C, Critical: >85°C")
-
-# Calculate status and business metrics
-status_text, status_color, status_icon = predict_wear_and_status(sim_pressure, sim_mileage, sim_temp)
-business_metrics = calculate_business_metrics(sim_pressure, sim_mileage, sim_temp, status_color)
+    
+    if use_live:
+        sim_mileage = int(round(live_reading.mileage))
+        sim_pressure = round(live_reading.pressure, 2)
+        sim_temp = round(live_reading.temperature, 2)
+        st.caption(f"📡 Tire #{live_reading.tire_id} | {live_reading.readings_total:,} readings ingested")
+    
+    return sim_mileage, sim_pressure, sim_temp, live_reading if use_live else None
 
 # --- COLUMN 1: DIGITAL TWIN VISUALIZATION ---
-with main_col1:
+def render_digital_twin(status_text, status_color, status_icon, annotations=()):
     st.markdown("### DIGITAL TWIN VISUALIZATION")
-    
-    # Dynamic glow based on status
-    glow_colors = {
-        "green": "rgba(60, 179, 113, 0.6)", 
-        "yellow": "rgba(255, 165, 0, 0.6)", 
-        "orange": "rgba(255, 69, 0, 0.6)",  
-        "red": "rgba(255, 0, 0, 0.6)"
-    }
-    
-    twin_glow = glow_colors.get(status_color, "rgba(0, 0, 128, 0.6)")
-    
-    model_path = "https://raw.githubusercontent.com/Areebrizz/Digital-Twin-Project/main/offorad_vehicle_tires.glb" 
-
-    html_code = f"""
-    <div class="digital-twin-container" style="box-shadow: 0 0 10px 3px {twin_glow};">
-        <script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.5.0/model-viewer.min.js"></script>
-        <model-viewer 
-            src="{model_path}" 
-            alt="Digital Twin Asset Model"
-            auto-rotate 
-            camera-controls
-            style="width: 100%; height: 280px; background-color: #F8F8F8;" 
-            shadow-intensity="1.5"
-            exposure="1.2"
-            environment-image="neutral"
-            >
-        </model-viewer>
-    </div>
-    """
-    components.html(html_code, height=300)
+
+    # Model and viewer runtime are served locally (see twin/assets.py). The viewer
+    # component mounts once per session; reruns only push state deltas to it
+    assets = asset_server()
+    sources = viewer_sources(assets.base_url) if assets is not None else viewer_sources()
+    selected = st.session_state.get("twin_viewer")
+    highlight = selected.get("material") if selected else None
+    state = viewer_state({material: status_color for material in TIRE_MATERIALS}, highlight, annotations)
+    with profiler.section("dashboard.model_viewer"):
+        twin_viewer(sources, state, key="twin_viewer")
     
     # Status indicator below twin
     status_class = {
@@ -380,7 +312,7 @@ with main_col1:
     st.markdown(f'<div class="{status_class[status_color]} status-indicator">{status_icon} {status_text}</div>', unsafe_allow_html=True)
 
 # --- COLUMN 2: REAL-TIME TELEMETRY (Gauges) ---
-with main_col2:
+def render_telemetry_gauges(sim_pressure, sim_temp, sim_mileage):
     st.markdown("### REAL-TIME TELEMETRY")
     
     # Calculate optimal range positions for gauges
@@ -460,7 +392,15 @@ with main_col2:
         st.caption(f"✅ Good: Within service life")
 
 # --- COLUMN 3: PRESCRIPTIVE ANALYTICS & QUICK METRICS ---
-with main_col3:
+def format_remaining_life(remaining):
+    """One line describing a single tire's RemainingLife projection."""
+    km, hours, label = float(remaining.km), float(remaining.hours), LIMIT_LABELS[int(remaining.limit)]
+    if km <= 0:
+        return f"**Remaining Life:** limit reached ({label})"
+    eta = f" (≈{hours:,.0f} h)" if hours == hours else ""
+    return f"**Remaining Life:** ~{km:,.0f} km{eta} until {label}"
+
+def render_prescriptive_analytics(status_text, status_color, status_icon, drift_alerts=(), remaining=None):
     st.markdown("### PRESCRIPTIVE ANALYTICS")
     
     # Alert Display with realistic recommendations
@@ -481,8 +421,14 @@ with main_col3:
         st.markdown("**Action:** **IMMEDIATE SHUTDOWN REQUIRED**. Impending failure.")
         st.markdown("**Maintenance Impact:** Critical intervention prevents catastrophic failure")
     
-    st.markdown('<div class="cyber-divider"></div>', unsafe_allow_html=True)
+    if remaining is not None:
+        st.markdown(format_remaining_life(remaining))
     
+    # Trend alerts from the live drift detector, raised before fixed limits are crossed
+    for alert in drift_alerts:
+        st.warning(f"📉 **Trend alert:** {alert}")
+
+def render_performance_metrics(business_metrics):
     # REALISTIC Performance Metrics
     st.markdown("### PERFORMANCE METRICS")
     col_a, col_b = st.columns(2)
@@ -506,21 +452,83 @@ with main_col3:
         st.metric("Risk Score", f"{business_metrics['risk_score']}/100", risk_delta, delta_color=risk_color,
                  help="Overall asset risk assessment (lower is better)")
 
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def asset_dashboard():
+    """Main grid: moving a slider reruns only this fragment, not the page."""
+    # Main Dashboard Grid - Single View, No Scroll
+    main_col1, main_col2, main_col3, main_col4 = st.columns([2.5, 1.3, 2.0, 1.5]) 
+    
+    # One snapshot per run, so the readout, drift alerts and remaining life all describe one tire
+    live_feed = telemetry_service()
+    snapshot = live_feed.snapshot() if live_feed is not None else None
+    with main_col4, profiler.section("dashboard.io_simulator"):
+        sim_mileage, sim_pressure, sim_temp, live_reading = render_io_simulator(snapshot)
+    
+    # Calculate status and business metrics
+    with profiler.section("engine.predict_wear_and_status"):
+        status_text, status_color, status_icon = risk_classifier()(sim_pressure, sim_mileage, sim_temp)
+    with profiler.section("engine.calculate_business_metrics"):
+        business_metrics = calculate_business_metrics(sim_pressure, sim_mileage, sim_temp, status_color)
+    drift_alerts = telemetry_service().drift.anomalies(live_reading.tire_id) if live_reading else []
+    
+    # Remaining useful life: the live tire's RLS fit, else the wear model from this reading
+    if live_reading is not None:
+        remaining = telemetry_service().rul.estimate(live_reading.tire_id)
+    else:
+        remaining = project_remaining_life(sim_pressure, sim_mileage, sim_temp)
+    
+    # Labels pinned to the model: the current reading, then any trend alerts
+    annotations = [{"id": "reading", "text": f"{status_icon} {sim_pressure:.1f} PSI · {sim_temp:.0f}°C"}]
+    annotations += [{"id": f"alert-{i}", "text": alert, "color": "#FF4500"} for i, alert in enumerate(drift_alerts)]
+    with main_col1, profiler.section("dashboard.digital_twin"):
+        render_digital_twin(status_text, status_color, status_icon, annotations)
+    with main_col2, profiler.section("dashboard.gauges"):
+        render_telemetry_gauges(sim_pressure, sim_temp, sim_mileage)
+    with main_col3:
+        with profiler.section("dashboard.prescriptive_analytics"):
+            render_prescriptive_analytics(status_text, status_color, status_icon, drift_alerts, remaining)
+        st.markdown('<div class="cyber-divider"></div>', unsafe_allow_html=True)
+        with profiler.section("dashboard.performance_metrics"):
+            render_performance_metrics(business_metrics)
+
+with profiler.section("fragment.asset_dashboard"):
+    asset_dashboard()
+
 # --- 5. BOTTOM SECTION: COMPACT TREND & ROI (Full Width) ---
 st.markdown('<div class="cyber-divider"></div>', unsafe_allow_html=True)
 
 trend_col1, trend_col2 = st.columns([4, 1])
 
-with trend_col1:
-    st.markdown("### ASSET HEALTH TREND ANALYSIS")
+TREND_MAX_POINTS = points_for_width(1600)  # per-trace point cap for the trend chart
+TREND_WINDOW_KM = 50000  # live history shown from the telemetry store
+TREND_MIN_BUCKETS = TREND_MAX_POINTS // 16  # coarsest rollup must still give ~8 px per bucket
+
+@st.cache_resource
+def trend_figure_cache():
+    """Process-wide LRU of built trend figures, shared by all sessions."""
+    return LRUCache(maxsize=32)
+
+def build_trend_figure(trend_data):
+    """Dual-axis pressure/temperature figure with critical threshold lines."""
+    # Plotly is only needed on a figure-cache miss
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    # Cap each trace to the chart's pixel budget, keeping threshold crossings
+    pressure_x, pressure_y = downsample_trace(
+        trend_data['Mileage (km)'], trend_data['Pressure (PSI)'], TREND_MAX_POINTS,
+        thresholds=(WEAR_THRESHOLD_PRESSURE, OVERPRESSURE_THRESHOLD))
+    temp_x, temp_y = downsample_trace(
+        trend_data['Mileage (km)'], trend_data['Temperature (°C)'], TREND_MAX_POINTS,
+        thresholds=(CRITICAL_TEMP_THRESHOLD,))
     
     # Plotly Dual-Axis Setup
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
     # Trace 1: Pressure (Primary Y-axis)
     fig.add_trace(go.Scatter(
-        x=df_sim['Mileage (km)'], 
-        y=df_sim['Pressure (PSI)'], 
+        x=pressure_x, 
+        y=pressure_y, 
         name='Pressure (PSI)',
         line=dict(color='#000080', width=3),
         fill='tozeroy',
@@ -529,12 +537,26 @@ with trend_col1:
     
     # Trace 2: Temperature (Secondary Y-axis)
     fig.add_trace(go.Scatter(
-        x=df_sim['Mileage (km)'], 
-        y=df_sim['Temperature (°C)'], 
+        x=temp_x, 
+        y=temp_y, 
         name='Temperature (°C)',
         line=dict(color='#800080', width=3)
     ), secondary_y=True) 
     
+    # Rollup buckets: shade each bucket's min-max range around the mean lines
+    if 'Pressure min (PSI)' in trend_data:
+        for label, color, secondary in (('Pressure', 'rgba(0, 0, 128, 0.2)', False),
+                                        ('Temperature', 'rgba(128, 0, 128, 0.2)', True)):
+            unit = '(PSI)' if label == 'Pressure' else '(°C)'
+            fig.add_trace(go.Scatter(
+                x=trend_data['Mileage (km)'], y=trend_data[f'{label} max {unit}'],
+                line=dict(width=0), hoverinfo='skip', showlegend=False
+            ), secondary_y=secondary)
+            fig.add_trace(go.Scatter(
+                x=trend_data['Mileage (km)'], y=trend_data[f'{label} min {unit}'],
+                name=f'{label} range', line=dict(width=0), fill='tonexty', fillcolor=color, hoverinfo='skip'
+            ), secondary_y=secondary)
+    
     # Add horizontal critical lines
     fig.add_hline(
         y=WEAR_THRESHOLD_PRESSURE, 
@@ -587,11 +609,77 @@ with trend_col1:
         gridcolor='#E0E0E0', showgrid=False, range=[20, 100], secondary_y=True 
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_trend_chart():
+    """Trend chart; independent of the sliders, refreshed only by the live feed."""
+    st.markdown("### ASSET HEALTH TREND ANALYSIS")
+    
+    # Live tire history when streaming (SQLite store if configured, else the ring buffer), else the simulation
+    trend_data = df_sim
+    trend_version = ("simulation", df_sim_version)
+    live_reading = live_reading_if_enabled()
+    live_history = telemetry_service().history.get(live_reading.tire_id) if live_reading else None
+    live_store = telemetry_service().store if live_reading else None
+    window = resolution = None
+    if live_store is not None:
+        # Full history from disk, as the coarsest rollup that still fills the chart
+        with profiler.section("trend.store_query"):
+            resolution, window = live_store.trend_window(live_reading.tire_id, TREND_WINDOW_KM, TREND_MIN_BUCKETS)
+        window_version = (resolution, len(window), float(window.mileage[-1]), float(window.timestamp[-1])) if len(window) else ()
+    elif live_history is not None:
+        window = live_history.window()
+        window_version = live_history.total
+    if window is not None and len(window) > 1:
+        trend_data = {
+            'Mileage (km)': window.mileage,
+            'Pressure (PSI)': window.pressure,
+            'Temperature (°C)': window.temperature,
+        }
+        if resolution is not None:
+            trend_data.update({
+                'Pressure min (PSI)': window.pressure_min,
+                'Pressure max (PSI)': window.pressure_max,
+                'Temperature min (°C)': window.temperature_min,
+                'Temperature max (°C)': window.temperature_max,
+            })
+        trend_version = ("live", live_reading.tire_id, window_version)
+    
+    # Figure construction (downsampling, subplots, threshold lines) is cached per data version and
+    # shared by reruns and sessions. st.plotly_chart still serializes the figure on every run: it has
+    # no public way to take a pre-serialized spec, and handing it a dict instead re-validates it
+    with profiler.section("trend.figure"):
+        fig = trend_figure_cache().get_or_build(
+            (trend_version, TREND_MAX_POINTS), lambda: build_trend_figure(trend_data))
+    
+    with profiler.section("trend.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    if resolution is not None:
+        st.caption(f"{resolution} rollups: mean with min–max range per bucket")
+
+with trend_col1, profiler.section("fragment.trend_chart"):
+    render_trend_chart()
 
-with trend_col2:
+@st.cache_data
+def simulated_fleet_lead_time():
+    """Median (hours, km) to the first limit for a simulated fleet (no live feed)."""
+    return median_time_to_limit(simulated_fleet_remaining_life())
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_strategic_roi():
+    # Predictive lead time: median remaining life across the live fleet, else a simulated one
+    live_feed = telemetry_service()
+    if live_feed is not None and live_feed.snapshot() is not None:
+        lead_hours, lead_km = median_time_to_limit(live_feed.rul.estimate())
+        lead_caption = "Predictive Lead Time (live fleet median)"
+    else:
+        lead_hours, lead_km = simulated_fleet_lead_time()
+        lead_caption = "Predictive Lead Time (simulated fleet median)"
+    lead_time = f"{lead_hours:,.0f}h" if lead_hours == lead_hours else f"{lead_km:,.0f} km"
+    
     st.markdown("### STRATEGIC ROI")
-    st.markdown("""
+    st.markdown(f"""
     <div style="background: #FFFFFF; border-radius: 10px; padding: 15px; border: 1px solid #000080; box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);">
     <h4 style="color: #3CB371; margin: 0;">📈 15-25%</h4>
     <p style="margin: 5px 0 10px 0; font-size: 0.8em; color: #111111;">Uptime Improvement</p>
@@ -602,11 +690,80 @@ with trend_col2:
     <h4 style="color: #3CB371; margin: 0;">⛽ 2-5%</h4>
     <p style="margin: 5px 0 10px 0; font-size: 0.8em; color: #111111;">Fuel Efficiency Gain</p>
     
-    <h4 style="color: #3CB371; margin: 0;">🛡️ 72h</h4>
-    <p style="margin: 5px 0; font-size: 0.8em; color: #111111;">Predictive Lead Time</p>
+    <h4 style="color: #3CB371; margin: 0;">🛡️ {lead_time}</h4>
+    <p style="margin: 5px 0; font-size: 0.8em; color: #111111;">{lead_caption}</p>
     </div>
     """, unsafe_allow_html=True)
 
+with trend_col2, profiler.section("page.roi"):
+    render_strategic_roi()
+
+# --- 6. FLEET OVERVIEW: WORST TIRES (collapsed, keeps the single-screen layout) ---
+FLEET_TOP_K = 1000
+COLOR_ICONS = {"green": "🟢", "yellow": "🟡", "orange": "🟠", "red": "🔴"}
+
+@st.cache_data
+def simulated_fleet():
+    """Stand-in fleet of ~20k vehicles when no live feed is running."""
+    return simulated_fleet_snapshot()
+
+@st.cache_resource
+def simulated_fleet_hierarchy():
+    """Vehicles and axles of the simulated fleet, aggregated once."""
+    fleet = simulated_fleet()
+    hierarchy = FleetHierarchy(simulated_layout(len(fleet)))
+    hierarchy.update(fleet.tire_id, fleet.code, maintenance_savings(fleet.code, fleet.mileage))
+    return hierarchy
+
+def render_vehicle_summary(hierarchy, vehicle, layout_simulated=False):
+    """Fleet totals by vehicle and one vehicle's axles, from the incremental aggregates."""
+    st.caption(("Simulated layout: " if layout_simulated else "")
+               + f"{hierarchy.layout.n_vehicles:,} vehicles by worst tire: "
+               + " · ".join(f"{COLOR_ICONS[color]} {count:,}" for color, count in hierarchy.vehicle_color_counts().items())
+               + f" · cost avoided ${hierarchy.fleet_savings:,}")
+    st.dataframe(hierarchy.vehicle_rows(vehicle), use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_fleet_overview():
+    live_feed = telemetry_service()
+    if live_feed is not None and live_feed.snapshot() is not None:
+        fleet, hierarchy, source = fleet_snapshot(live_feed), live_feed.hierarchy, "live fleet"
+        # Without TWIN_FLEET_LAYOUT the vehicles and axles are made up; only the tires are live
+        layout_simulated = live_fleet_layout()[1]
+        if layout_simulated:
+            source += " (simulated layout)"
+    else:
+        fleet, hierarchy, source = simulated_fleet(), simulated_fleet_hierarchy(), "simulated fleet"
+        layout_simulated = True
+
+    rank_col, k_col, page_col = st.columns([2, 1, 1])
+    with rank_col:
+        ranking = st.selectbox("Rank by", list(RANKINGS), format_func=lambda key: RANKINGS[key][0],
+                               key="fleet_ranking")
+    with k_col:
+        k = st.number_input("Top K", min_value=PAGE_SIZE, max_value=10 * FLEET_TOP_K, value=FLEET_TOP_K,
+                            step=PAGE_SIZE, key="fleet_top_k")
+    with profiler.section("fleet.top_k"):
+        worst = worst_tires(fleet, k, ranking)
+    with page_col:
+        pages = page_of(worst, 0)[1]
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="fleet_page")
+    visible, _ = page_of(worst, page - 1)
+
+    st.caption(f"{len(fleet):,} tires in the {source} · {maintenance_due(fleet):,} need maintenance · "
+               f"showing ranks {(page - 1) * PAGE_SIZE + 1}–{(page - 1) * PAGE_SIZE + len(visible)} "
+               f"of the top {len(worst):,}")
+    st.dataframe(fleet_rows(fleet, visible, hierarchy.layout), use_container_width=True, hide_index=True)
+
+    # Drill down into a vehicle, by default the one carrying the worst tire
+    first_vehicle = hierarchy.tire_vehicle[fleet.tire_id[worst[0]]] if len(worst) else 0
+    vehicle = st.number_input("Vehicle", min_value=0, max_value=hierarchy.layout.n_vehicles - 1,
+                              value=int(first_vehicle), key="fleet_vehicle")
+    render_vehicle_summary(hierarchy, vehicle, layout_simulated)
+
+with st.expander("FLEET OVERVIEW: WORST TIRES", expanded=False), profiler.section("page.fleet"):
+    render_fleet_overview()
+
 # Footer
 st.markdown('<div class="cyber-divider"></div>', unsafe_allow_html=True)
 footer_col1, footer_col2, footer_col3 = st.columns([2, 1, 1])
@@ -614,5 +771,47 @@ with footer_col1:
     st.caption("© 2024 Erasmus Meta 4.0 Digital Twin Platform | Real-time Prescriptive Maintenance")
 with footer_col2:
     st.caption("System Status: **OPERATIONAL**")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_last_update():
+    live_reading = live_reading_if_enabled()
+    if live_reading is not None:
+        st.caption(f"Last Update: {time.strftime('%H:%M:%S', time.localtime(live_reading.timestamp))}")
+    else:
+        st.caption("Last Update: Live Feed")
+
 with footer_col3:
-    st.caption("Last Update: Live Feed")
+    render_last_update()
+
+@st.cache_resource
+def metrics_exporter():
+    """Optional Prometheus /metrics endpoint (TWIN_METRICS_PORT), started once per process."""
+    port = os.environ.get("TWIN_METRICS_PORT")
+    if not port:
+        return None
+    exporter = MetricsExporter(port=int(port))
+    live_feed = telemetry_service()
+    if live_feed is not None:
+        exporter.add_collector(lambda: telemetry_families(live_feed))
+        exporter.add_collector(lambda: drift_families(live_feed.drift))
+    timings = render_profiler()
+    exporter.add_collector(lambda: profiler_families(timings))
+    caches = {"simulation_data": simulation_cache_stats(), "trend_figure": trend_figure_cache()}
+    exporter.add_collector(lambda: cache_families(caches))
+    return exporter.start()
+
+metrics_exporter()
+
+if profiler.enabled:
+    profiler.record("page.total", time.perf_counter() - page_start)
+
+    # Hidden diagnostics panel: open the page with ?diagnostics
+    if "diagnostics" in st.query_params:
+        with st.expander("Render diagnostics", expanded=True):
+            diagnostics = profiler.to_json()
+            st.dataframe([{"section": name, **stats} for name, stats in profiler.summary().items()],
+                         use_container_width=True, hide_index=True)
+            st.download_button("Download JSON", diagnostics, file_name="twin_render_timings.json",
+                               mime="application/json")
+            if st.button("Reset timings"):
+                profiler.reset()
@@ -0,0 +1,243 @@
+"""Benchmarks for the risk engine, business metrics, simulator, store and page render.
+
+Usage::
+
+    python benchmarks/bench_twin.py --output bench.json
+    python benchmarks/bench_twin.py --output new.json --compare bench.json
+
+Each case reports the best wall time over ``--repeats`` runs and a rate
+(rows/s for scoring, fleet ranking and store inserts, queries/s for store reads,
+tire-lifetimes/s for simulation, runs/s for the page).
+Results are written as JSON together with the commit and library versions,
+so two files can be compared across commits; ``--compare`` flags cases that
+got slower than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from twin.core import (  # noqa: E402
+    FleetSnapshot,
+    calculate_business_metrics,
+    calculate_business_metrics_batch,
+    default_lut,
+    predict_wear_and_status,
+    predict_wear_and_status_batch,
+    project_remaining_life,
+    risk_codes,
+    simulate_tires,
+    worst_tires,
+)
+from twin.metrics import risk_scores  # noqa: E402
+from twin.store import TelemetryStore  # noqa: E402
+
+DEFAULT_SIZES = (1, 100, 10_000, 1_000_000)
+SCALAR_MAX_ROWS = 100_000  # the per-reading Python path is too slow beyond this
+STORE_BATCH = 8192         # readings per telemetry batch written to the store
+STORE_TIRES = 10_000       # readings are spread over this many tires
+STORE_STEP_KM = 2.0        # distance between a tire's readings
+STORE_STEP_SECONDS = 60.0  # time between a tire's readings
+STORE_QUERY_KM = 50_000    # trend-chart window
+STORE_MIN_BUCKETS = 200    # trend-chart fill target
+FLEET_TOP_K = 1000         # fleet-overview ranking depth
+
+
+def fleet_readings(n, seed=0):
+    """Reproducible readings spread across all status bands."""
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(25.0, 40.0, n), 1),
+        np.round(rng.uniform(0, 50000, n) / 500) * 500,
+        np.round(rng.uniform(30.0, 90.0, n) * 2) / 2,
+    )
+
+
+def best_time(func, repeats, min_time=0.05):
+    """Best per-call wall time, looping short calls until ``min_time`` elapses."""
+    func()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def scoring_cases(n):
+    pressure, mileage, temp = fleet_readings(n)
+    colors = predict_wear_and_status_batch(pressure, mileage, temp).color
+    code = risk_codes(pressure, mileage, temp)[0]
+    remaining = project_remaining_life(pressure, mileage, temp)
+    fleet = FleetSnapshot(np.arange(n), pressure, temp, mileage, code, risk_scores(pressure, mileage, temp, code),
+                          remaining.km, remaining.hours, remaining.limit)
+    cases = {
+        "risk_codes": lambda: risk_codes(pressure, mileage, temp),
+        "risk_lut_lookup": lambda: default_lut().lookup(pressure, mileage, temp),
+        "predict_wear_and_status_batch": lambda: predict_wear_and_status_batch(pressure, mileage, temp),
+        "calculate_business_metrics_batch": lambda: calculate_business_metrics_batch(pressure, mileage, temp),
+        "fleet_worst_tires": lambda: worst_tires(fleet, FLEET_TOP_K, "risk"),
+    }
+    if n <= SCALAR_MAX_ROWS:
+        p, m, t, c = pressure.tolist(), mileage.tolist(), temp.tolist(), colors.tolist()
+        cases["predict_wear_and_status"] = lambda: [predict_wear_and_status(*row) for row in zip(p, m, t)]
+        cases["risk_lut_predict"] = lambda: [default_lut().predict(*row) for row in zip(p, m, t)]
+        cases["calculate_business_metrics"] = lambda: [calculate_business_metrics(*row) for row in zip(p, m, t, c)]
+    return cases
+
+
+def run_store(n, repeats):
+    """Telemetry store: insert rate (rollups included) for ``n`` readings in
+    random tire order, then the trend-chart query (taken before the final
+    merge, with staging full)."""
+    pressure, _, temp = fleet_readings(n)
+    rng = np.random.default_rng(0)
+    tire_id = rng.integers(0, min(n, STORE_TIRES), n)
+    # Each tire's k-th reading is k steps along, so keys are unique per tire
+    order = np.argsort(tire_id, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - np.searchsorted(tire_id[order], tire_id[order])
+    mileage = rank * STORE_STEP_KM
+    timestamp = 1.7e9 + rank * STORE_STEP_SECONDS
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryStore(Path(directory) / "bench.db")
+        start = time.perf_counter()
+        for i in range(0, n, STORE_BATCH):
+            rows = slice(i, i + STORE_BATCH)
+            store.append_batch(tire_id[rows], mileage[rows], pressure[rows], temp[rows], timestamp[rows])
+        inserted = time.perf_counter() - start
+        query = best_time(lambda: store.trend_window(tire_id[-1], STORE_QUERY_KM, STORE_MIN_BUCKETS), repeats)
+        start = time.perf_counter()
+        store.flush()
+        inserted += time.perf_counter() - start
+        store.close()
+    return [
+        {"name": "store_append_batch", "size": n, "seconds": inserted, "rate": n / inserted, "unit": "rows/s"},
+        {"name": "store_trend_window", "size": n, "seconds": query, "rate": 1 / query, "unit": "queries/s"},
+    ]
+
+
+def run_page(repeats):
+    """Cold and warm script-run time of app.py under Streamlit's test harness."""
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+        start = time.perf_counter()
+        app.run()
+        cold = time.perf_counter() - start
+        if app.exception:
+            raise RuntimeError(f"app.py raised: {app.exception}")
+        warm = min(_timed(app.run) for _ in range(repeats))
+    for name, seconds in (("app_run_cold", cold), ("app_run_warm", warm)):
+        results.append({"name": name, "size": 1, "seconds": seconds, "rate": 1 / seconds, "unit": "runs/s"})
+    return results
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(sizes, repeats, page=True):
+    results = []
+    for n in sizes:
+        for name, func in scoring_cases(n).items():
+            seconds = best_time(func, repeats)
+            results.append({"name": name, "size": n, "seconds": seconds, "rate": n / seconds, "unit": "rows/s"})
+            print(f"{name:>34} n={n:<9} {n / seconds:>14,.0f} rows/s", file=sys.stderr)
+        seconds = best_time(lambda: simulate_tires(n, seed=0, keep_history=False), repeats)
+        results.append({"name": "simulate_tires", "size": n, "seconds": seconds, "rate": n / seconds,
+                        "unit": "lifetimes/s"})
+        print(f"{'simulate_tires':>34} n={n:<9} {n / seconds:>14,.0f} lifetimes/s", file=sys.stderr)
+        for result in run_store(n, repeats):
+            results.append(result)
+            print(f"{result['name']:>34} n={n:<9} {result['rate']:>14,.0f} {result['unit']}", file=sys.stderr)
+    if page:
+        for result in run_page(repeats):
+            results.append(result)
+            print(f"{result['name']:>34} {result['seconds'] * 1000:>23.1f} ms", file=sys.stderr)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(baseline, current, tolerance):
+    """Print per-case speed ratios; returns the number of regressions."""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        before = previous.get((result["name"], result["size"]))
+        if before is None:
+            continue
+        ratio = result["rate"] / before["rate"]
+        slower = ratio < 1 - tolerance
+        regressions += slower
+        flag = "  REGRESSION" if slower else ""
+        print(f"{result['name']:>34} n={result['size']:<9} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="fleet sizes")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-page", action="store_true", help="skip the app.py render benchmark")
+    parser.add_argument("--output", help="write JSON results here (default stdout)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment(), "results": run(args.sizes, args.repeats, page=not args.no_page)}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), report, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
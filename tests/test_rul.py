@@ -0,0 +1,31 @@
+import numpy as np
+
+from twin.rul import RemainingLifeEstimator
+
+
+def test_speed_with_several_readings_per_tire_in_one_batch():
+    # Like TelemetryService: 10 readings per batch, all stamped with the batch's arrival time
+    estimator = RemainingLifeEstimator(max_tires=4)
+    readings, interval_s, speed_kmh = 10, 36.0, 100.0
+    step_km = speed_kmh * interval_s / 3600.0
+    for batch in range(20):
+        mileage = 1000.0 + step_km * (batch * readings + np.arange(1, readings + 1))
+        now = batch * readings * interval_s
+        estimator.update(np.full(readings, 2), 33.0, 45.0, mileage, now)
+    assert np.isclose(estimator.speed_kmh[2], speed_kmh)
+
+
+def test_speed_with_a_timestamp_per_reading():
+    estimator = RemainingLifeEstimator(max_tires=4)
+    n = 150  # spans several scan blocks
+    estimator.update(np.full(n, 1), 33.0, 45.0, 500.0 + 2.0 * np.arange(n), 72.0 * np.arange(n))
+    assert np.isclose(estimator.speed_kmh[1], 100.0)
+
+
+def test_non_finite_readings_are_skipped():
+    estimator = RemainingLifeEstimator(max_tires=4)
+    estimator.update([0, 0, 0, 0], [33.0, np.nan, 32.9, 32.8], [45.0, 45.0, np.inf, 46.0],
+                     [0.0, 100.0, 200.0, 300.0], [0.0, 3600.0, 7200.0, 10800.0])
+    assert estimator.samples[0] == 2
+    assert np.isfinite([estimator.pressure[0], estimator.pressure_rate[0], estimator.p00[0]]).all()
+    assert np.isclose(estimator.speed_kmh[0], 100.0)  # 300 km in the 3 h between the valid readings
@@ -0,0 +1,5 @@
+"""META 4.0 Digital Twin engine: thresholds, risk scoring and simulation.
+
+Modules in this package are importable without Streamlit so batch workers can
+reuse the same rules the dashboard in ``app.py`` displays.
+"""
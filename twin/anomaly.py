@@ -0,0 +1,278 @@
+"""Streaming drift detection on live pressure and temperature.
+
+The rule engine only compares each reading against fixed limits, so a slow
+leak or a tire that keeps heating up is reported once it crosses them.
+:class:`DriftDetector` runs alongside it and watches the trend instead:
+
+* an EWMA of the rate of change per 1,000 km flags rapid pressure loss and
+  thermal runaway;
+* one-sided CUSUMs accumulate pressure lost and heat gained beyond what
+  normal wear explains (an allowance per km plus a per-sample noise
+  deadband), flagging slow leaks and thermal drift.
+
+Mileage is the clock, so parked tires only get the noise deadband. State is
+a handful of arrays indexed by tire id; each reading costs O(1) and no
+history is ever rescanned. A batch is laid out with one column per tire
+(:func:`tire_blocks`) and both recurrences are evaluated down the columns in
+closed form (:func:`ewma_scan`, :func:`cusum_scan`), so a tire sending
+thousands of readings in one batch costs a few array passes, not a Python
+step per reading. Readings with a non-finite value are skipped.
+"""
+import numpy as np
+
+# Anomaly bits
+ANOMALY_SLOW_LEAK = 1
+ANOMALY_RAPID_PRESSURE_LOSS = 2
+ANOMALY_THERMAL_DRIFT = 4
+ANOMALY_THERMAL_RUNAWAY = 8
+ANOMALY_LABELS = {
+    ANOMALY_SLOW_LEAK: "SLOW LEAK - PRESSURE DRIFTING DOWN",
+    ANOMALY_RAPID_PRESSURE_LOSS: "RAPID PRESSURE LOSS",
+    ANOMALY_THERMAL_DRIFT: "THERMAL DRIFT - TEMPERATURE CREEPING UP",
+    ANOMALY_THERMAL_RUNAWAY: "THERMAL RUNAWAY",
+}
+
+# Defaults, tuned so the simulator's normal wear stays quiet
+EWMA_ALPHA = 0.2
+MIN_RATE_KM = 50.0             # km - shorter steps do not update the rates
+LEAK_ALLOWANCE = 0.7           # PSI per 1,000 km of normal loss
+PRESSURE_DEADBAND = 0.05       # PSI of sensor noise per sample
+LEAK_LIMIT = 1.0               # PSI of unexplained loss
+RAPID_LOSS_RATE = 2.0          # PSI lost per 1,000 km
+HEAT_ALLOWANCE = 5.0           # °C per 1,000 km of normal warming
+TEMP_DEADBAND = 0.5            # °C of sensor noise per sample
+HEAT_LIMIT = 10.0              # °C of unexplained warming
+RUNAWAY_RATE = 10.0            # °C gained per 1,000 km
+WARMUP_SAMPLES = 5             # rate alarms need this many readings
+SCAN_WIDTH = 64                # readings per tire scanned in one pass
+
+
+def _tire_groups(tire_id):
+    """Row order grouping the batch by tire (stable), and each row's rank within its tire."""
+    order = np.argsort(tire_id, kind="stable")
+    sorted_ids = tire_id[order]
+    group_start = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    counts = np.diff(np.r_[group_start, order.size])
+    rank = np.arange(order.size) - np.repeat(group_start, counts)
+    return order, rank, counts
+
+
+def tire_rounds(tire_id):
+    """Split a batch into rounds of row indices with no repeated tire.
+
+    Round ``r`` holds each tire's ``r``-th reading, so applying the rounds in
+    order updates per-tire state exactly as one-at-a-time feeding would.
+    """
+    order, rank, _ = _tire_groups(tire_id)
+    sizes = np.bincount(rank)
+    if sizes.size == 1:
+        return [np.arange(tire_id.size)]
+    return np.split(order[np.argsort(rank, kind="stable")], np.cumsum(sizes)[:-1])
+
+
+def tire_blocks(tire_id, width=SCAN_WIDTH):
+    """Lay a batch out as grids of row indices with one column per tire.
+
+    Row ``r`` of grid ``b`` holds each tire's ``b * width + r``-th reading,
+    with -1 padding the columns of tires that have fewer; tires with no
+    readings left drop out. Scanning the grids in order along axis 0
+    updates per-tire state exactly as one-at-a-time feeding would.
+    """
+    order, rank, counts = _tire_groups(tire_id)
+    group = np.repeat(np.arange(counts.size), counts)
+    for first in range(0, int(counts.max(initial=0)), width):
+        active = counts > first
+        grid_column = np.cumsum(active) - 1
+        block = (rank >= first) & (rank < first + width)
+        grid = np.full((min(width, int(counts.max()) - first), int(active.sum())), -1, dtype=np.intp)
+        grid[rank[block] - first, grid_column[group[block]]] = order[block]
+        yield grid
+
+
+def accumulate(ufunc, values):
+    """``ufunc.accumulate`` down axis 0 of a grid.
+
+    NumPy accumulates each column separately, which is slow for the short,
+    wide grids of batches with many tires, so those go row by row instead.
+    """
+    values = np.asarray(values)
+    if values.shape[0] >= values.shape[1]:
+        return ufunc.accumulate(values, axis=0)
+    out = values.copy()
+    for row in range(1, out.shape[0]):
+        ufunc(out[row - 1], out[row], out=out[row])
+    return out
+
+
+def ewma_scan(start, alpha, values):
+    """EWMA ``s += alpha * (value - s)`` down each column of ``values``, from ``start`` per column.
+
+    ``alpha`` may vary per element (0 skips one). A NaN start is replaced by
+    the column's first value with a nonzero ``alpha``. Returns every
+    intermediate state; ``1 - alpha`` raised to the column length must stay
+    representable, which :data:`SCAN_WIDTH` keeps true for usual alphas.
+    """
+    start = np.asarray(start, dtype=np.float64)[None, :]
+    fresh = np.isnan(start)
+    if fresh.any():
+        counted = accumulate(np.add, (alpha > 0).astype(np.int64))
+        first = fresh & (alpha > 0) & (counted == 1)
+        alpha = np.where(first, 1.0, alpha)
+        keep = accumulate(np.multiply, np.where(first, 1.0, 1.0 - alpha))
+        state = np.where(fresh, 0.0, start) * keep + keep * accumulate(np.add, alpha * values / keep)
+        return np.where(fresh & (counted == 0), np.nan, state)
+    keep = accumulate(np.multiply, 1.0 - alpha)
+    return keep * (start + accumulate(np.add, alpha * values / keep))
+
+
+def cusum_scan(start, steps):
+    """One-sided CUSUM ``s = max(0, s + step)`` down each column of ``steps``, from ``start >= 0``.
+
+    Returns every intermediate state, using ``s_j = c_j - min(0, min(c_1..c_j))``
+    for the running total ``c`` of the steps.
+    """
+    total = np.asarray(start, dtype=np.float64)[None, :] + accumulate(np.add, steps)
+    return total - np.minimum(accumulate(np.minimum, total), 0.0)
+
+
+def latest_valid(valid):
+    """Row of each element's latest ``valid`` element above it in its column, -1 if none."""
+    rows = np.arange(valid.shape[0])[:, None]
+    latest = accumulate(np.maximum, np.where(valid, rows, -1))
+    return np.concatenate((np.full((1, valid.shape[1]), -1), latest[:-1]), axis=0)
+
+
+def carry_forward(before, values, start):
+    """``values`` at the rows ``before`` (from :func:`latest_valid`), ``start`` where it is -1."""
+    carried = np.take_along_axis(values, np.maximum(before, 0), axis=0)
+    return np.where(before >= 0, carried, np.asarray(start)[None, :])
+
+
+def decode_anomalies(mask):
+    """Expand one anomaly bitmask into its labels."""
+    return [label for bit, label in ANOMALY_LABELS.items() if int(mask) & bit]
+
+
+class DriftDetector:
+    """Per-tire EWMA rate and CUSUM drift state for up to ``max_tires`` tires."""
+
+    def __init__(self, max_tires=65536, alpha=EWMA_ALPHA, leak_allowance=LEAK_ALLOWANCE,
+                 leak_limit=LEAK_LIMIT, rapid_loss_rate=RAPID_LOSS_RATE, heat_allowance=HEAT_ALLOWANCE,
+                 heat_limit=HEAT_LIMIT, runaway_rate=RUNAWAY_RATE):
+        if not 0 <= alpha < 1:
+            raise ValueError("alpha must be in [0, 1)")
+        self.max_tires = max_tires
+        self.alpha = alpha
+        self.leak_allowance = leak_allowance
+        self.leak_limit = leak_limit
+        self.rapid_loss_rate = rapid_loss_rate
+        self.heat_allowance = heat_allowance
+        self.heat_limit = heat_limit
+        self.runaway_rate = runaway_rate
+
+        self.samples = np.zeros(max_tires, dtype=np.uint32)
+        self.last_pressure = np.full(max_tires, np.nan)
+        self.last_temperature = np.full(max_tires, np.nan)
+        self.last_mileage = np.full(max_tires, np.nan)
+        self.pressure_rate = np.zeros(max_tires)     # PSI per 1,000 km (EWMA)
+        self.temperature_rate = np.zeros(max_tires)  # °C per 1,000 km (EWMA)
+        self.leak_cusum = np.zeros(max_tires)        # PSI
+        self.heat_cusum = np.zeros(max_tires)        # °C
+        self.flags = np.zeros(max_tires, dtype=np.uint8)
+
+    def reset(self, tire_id):
+        """Forget one tire or an array of tires (e.g. after a tire change)."""
+        for column in (self.last_pressure, self.last_temperature, self.last_mileage):
+            column[tire_id] = np.nan
+        for column in (self.samples, self.pressure_rate, self.temperature_rate,
+                       self.leak_cusum, self.heat_cusum, self.flags):
+            column[tire_id] = 0
+
+    def update(self, tire_id, pressure, temperature, mileage):
+        """Feed readings (in arrival order) and return each row's anomaly bits.
+
+        Tire ids must be below ``max_tires``. A tire may appear several
+        times in one batch; its readings are applied in order. Readings
+        with a non-finite value are skipped and report the tire's flags as
+        they stood.
+        """
+        tire_id, pressure, temperature, mileage = np.broadcast_arrays(
+            np.asarray(tire_id, dtype=np.intp),
+            np.asarray(pressure, dtype=np.float64),
+            np.asarray(temperature, dtype=np.float64),
+            np.asarray(mileage, dtype=np.float64),
+        )
+        shape = tire_id.shape
+        tire_id, pressure, temperature, mileage = (a.ravel() for a in (tire_id, pressure, temperature, mileage))
+        flags = np.zeros(tire_id.size, dtype=np.uint8)
+        if tire_id.size == 0:
+            return flags.reshape(shape)
+
+        finite = np.isfinite(pressure) & np.isfinite(temperature) & np.isfinite(mileage)
+        for grid in tire_blocks(tire_id):
+            padded = grid >= 0
+            rows = np.maximum(grid, 0)
+            cell_flags = self._scan(tire_id[rows[0]], pressure[rows], temperature[rows], mileage[rows],
+                                    padded & finite[rows])
+            flags[grid[padded]] = cell_flags[padded]
+        return flags.reshape(shape)
+
+    def _scan(self, tires, pressure, temperature, mileage, valid):
+        """Apply a (readings × tires) grid, one column per tire, and return each cell's flags.
+
+        Cells that are not ``valid`` (padding, non-finite readings) leave the
+        state as it was.
+        """
+        samples_before = self.samples[tires][None, :] + accumulate(np.add, valid.astype(np.int64)) - valid
+        seen = valid & (samples_before > 0)
+        before = latest_valid(valid)
+        last_pressure = carry_forward(before, pressure, self.last_pressure[tires])
+        last_temperature = carry_forward(before, temperature, self.last_temperature[tires])
+        last_mileage = carry_forward(before, mileage, self.last_mileage[tires])
+        distance = np.where(seen, mileage - last_mileage, 0.0)
+        distance = np.maximum(np.nan_to_num(distance), 0.0)
+        pressure_change = np.where(seen, pressure - last_pressure, 0.0)
+        temperature_change = np.where(seen, temperature - last_temperature, 0.0)
+
+        # EWMA rates of change, only over steps long enough to be meaningful
+        moved = seen & (distance >= MIN_RATE_KM)
+        per_1000km = 1000.0 / np.where(moved, distance, 1.0)
+        alpha = np.where(moved, self.alpha, 0.0)
+        pressure_rate = ewma_scan(self.pressure_rate[tires], alpha, pressure_change * per_1000km)
+        temperature_rate = ewma_scan(self.temperature_rate[tires], alpha, temperature_change * per_1000km)
+
+        # CUSUMs of loss and warming beyond normal wear
+        km = distance / 1000.0
+        leak = cusum_scan(self.leak_cusum[tires],
+                          -pressure_change - self.leak_allowance * km - PRESSURE_DEADBAND * seen)
+        heat = cusum_scan(self.heat_cusum[tires],
+                          temperature_change - self.heat_allowance * km - TEMP_DEADBAND * seen)
+
+        samples = samples_before + valid
+        warm = samples > WARMUP_SAMPLES
+        flags = (
+            (leak > self.leak_limit) * np.uint8(ANOMALY_SLOW_LEAK)
+            | (warm & (pressure_rate < -self.rapid_loss_rate)) * np.uint8(ANOMALY_RAPID_PRESSURE_LOSS)
+            | (heat > self.heat_limit) * np.uint8(ANOMALY_THERMAL_DRIFT)
+            | (warm & (temperature_rate > self.runaway_rate)) * np.uint8(ANOMALY_THERMAL_RUNAWAY)
+        ).astype(np.uint8)
+
+        # The last row is each tire's state after the grid
+        self.samples[tires] = samples[-1]
+        self.last_pressure[tires] = np.where(valid[-1], pressure[-1], last_pressure[-1])
+        self.last_temperature[tires] = np.where(valid[-1], temperature[-1], last_temperature[-1])
+        self.last_mileage[tires] = np.where(valid[-1], mileage[-1], last_mileage[-1])
+        self.pressure_rate[tires] = pressure_rate[-1]
+        self.temperature_rate[tires] = temperature_rate[-1]
+        self.leak_cusum[tires] = leak[-1]
+        self.heat_cusum[tires] = heat[-1]
+        self.flags[tires] = flags[-1]
+        return flags
+
+    def anomalies(self, tire_id):
+        """Current anomaly labels for one tire."""
+        return decode_anomalies(self.flags[tire_id])
+
+    def counts(self):
+        """Number of tires currently raising each anomaly bit."""
+        return {bit: int(np.count_nonzero(self.flags & bit)) for bit in ANOMALY_LABELS}
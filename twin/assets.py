@@ -0,0 +1,259 @@
+"""Local serving of the digital twin's 3D assets.
+
+The GLB and the model-viewer runtime are served by the app itself instead of
+raw.githubusercontent.com and a CDN, so the twin renders without network
+access and clients download the large model once.
+
+* By default files are served from ``static/`` through Streamlit's static
+  file serving (``app/static/...``), with the content digest in the query
+  string so a changed file always gets a new URL and ETag revalidation
+  answers unchanged files with 304.
+* ``AssetServer`` is a small threaded HTTP server for local deployments that
+  adds strong ETags and ``Cache-Control: immutable`` for versioned URLs.
+
+Offline preprocessing (``python -m twin.assets``) vendors the model-viewer
+and meshopt decoder scripts, writes decimated level-of-detail variants
+(:mod:`twin.lod`) and, when ``gltfpack`` is installed, a meshopt-compressed,
+quantized variant of the model, plus a manifest. The viewer picks the
+coarsest level that covers its rendered size, and uses the compressed
+full-detail variant only when the browser supports WebAssembly.
+"""
+import argparse
+import hashlib
+import json
+import mimetypes
+import shutil
+import subprocess
+import threading
+import urllib.request
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from twin.lod import LOD_LEVELS, build_lods
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+MODEL_DIR = STATIC_DIR / "models"
+VENDOR_DIR = STATIC_DIR / "vendor"
+MANIFEST_PATH = MODEL_DIR / "manifest.json"
+
+MODEL_NAME = "offorad_vehicle_tires.glb"
+STREAMLIT_STATIC_BASE = "app/static"
+
+MODEL_VIEWER_URL = "https://ajax.googleapis.com/ajax/libs/model-viewer/3.5.0/model-viewer.min.js"
+MESHOPT_DECODER_URL = "https://cdn.jsdelivr.net/npm/meshoptimizer@0.21.0/meshopt_decoder.js"
+MODEL_VIEWER_FILE = "model-viewer.min.js"
+MESHOPT_DECODER_FILE = "meshopt_decoder.js"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("text/javascript", ".js")
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """Short SHA-256 of a file, memoized on (mtime, size)."""
+    path = Path(path)
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        cached = _digests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    value = digest.hexdigest()[:16]
+    with _digests_lock:
+        _digests[path] = (stamp, value)
+    return value
+
+
+def load_manifest():
+    """Variants written by :func:`prepare_assets`, or ``{}`` if not prepared."""
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(relative_path, base=STREAMLIT_STATIC_BASE):
+    """Versioned URL of a file under ``static/``, or ``None`` if it is missing."""
+    path = STATIC_DIR / relative_path
+    if not path.is_file():
+        return None
+    return f"{base}/{relative_path}?v={file_digest(path)}"
+
+
+def viewer_sources(base=STREAMLIT_STATIC_BASE):
+    """URLs the model-viewer iframe needs, preferring local copies.
+
+    Returns ``model``, ``compressed_model`` (``None`` unless both the
+    compressed variant and a local decoder exist), ``lods`` (levels of
+    detail as ``{"url", "max_pixels", "triangles"}``, coarsest first),
+    ``viewer_script`` and ``meshopt_decoder``.
+    """
+    variants = load_manifest().get("variants", {})
+    decoder = asset_url(f"vendor/{MESHOPT_DECODER_FILE}", base)
+    compressed = variants.get("meshopt")
+    lods = [{"url": asset_url(f"models/{variant['file']}", base), "max_pixels": variant["max_pixels"],
+             "triangles": variant["triangles"]}
+            for variant in sorted(variants.values(), key=lambda variant: variant.get("max_pixels", 0))
+            if "max_pixels" in variant]
+    return {
+        "model": asset_url(f"models/{MODEL_NAME}", base),
+        "compressed_model": asset_url(f"models/{compressed['file']}", base) if compressed and decoder else None,
+        "lods": [lod for lod in lods if lod["url"]],
+        "viewer_script": asset_url(f"vendor/{MODEL_VIEWER_FILE}", base) or MODEL_VIEWER_URL,
+        "meshopt_decoder": decoder,
+    }
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    root = STATIC_DIR
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        root = self.root.resolve()
+        path = (root / unquote(url.path).lstrip("/")).resolve()
+        if root not in path.parents or not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        digest = file_digest(path)
+        etag = f'"{digest}"'
+        versioned = parse_qs(url.query).get("v", [None])[0] == digest
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._cache_headers(etag, versioned)
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self._cache_headers(etag, versioned)
+        self.end_headers()
+        if send_body:
+            with open(path, "rb") as handle:
+                shutil.copyfileobj(handle, self.wfile)
+
+    def _cache_headers(self, etag, versioned):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", IMMUTABLE_CACHE if versioned else "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AssetServer:
+    """Serve ``static/`` with strong ETags and immutable caching in a daemon thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, root=STATIC_DIR):
+        handler = type("AssetHandler", (_AssetHandler,), {"root": Path(root)})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{'localhost' if self.host in ('127.0.0.1', '0.0.0.0') else self.host}:{self.port}"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="twin-assets", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+
+# --- offline preprocessing ---
+def _variant(path):
+    return {"file": path.name, "bytes": path.stat().st_size, "digest": file_digest(path)}
+
+
+def _geometry(report):
+    return {"triangles": report.triangles, "vertices": report.vertices, "geometry_bytes": report.geometry_bytes}
+
+
+def compress_model(source, target):
+    """Write a meshopt-compressed, quantized copy of ``source`` with gltfpack.
+
+    Returns ``False`` when gltfpack is not installed. Named nodes and
+    materials are kept so the viewer can still address individual parts.
+    """
+    gltfpack = shutil.which("gltfpack")
+    if gltfpack is None:
+        return False
+    subprocess.run([gltfpack, "-i", str(source), "-o", str(target), "-cc", "-kn", "-km"], check=True)
+    return True
+
+
+def fetch_vendor_scripts():
+    """Download the model-viewer runtime and meshopt decoder into ``static/vendor``."""
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for url, name in ((MODEL_VIEWER_URL, MODEL_VIEWER_FILE), (MESHOPT_DECODER_URL, MESHOPT_DECODER_FILE)):
+        with urllib.request.urlopen(url, timeout=60) as response, open(VENDOR_DIR / name, "wb") as handle:
+            shutil.copyfileobj(response, handle)
+
+
+def prepare_assets(fetch_vendor=False, lods=True):
+    """Build the model variants and manifest; returns the manifest."""
+    source = MODEL_DIR / MODEL_NAME
+    variants = {"original": _variant(source)}
+    manifest = {"model": MODEL_NAME, "variants": variants}
+    if lods:
+        # Levels share the exported textures, addressed by digest so they cache as immutable
+        reports, files, images = build_lods(source, LOD_LEVELS,
+                                            image_uri=lambda path: f"{path.name}?v={file_digest(path)}")
+        variants["original"].update(_geometry(reports[0]))
+        for level, report, path in zip(LOD_LEVELS, reports[1:], files):
+            variants[level.name] = dict(_variant(path), max_pixels=level.max_pixels, **_geometry(report))
+        manifest["images"] = [_variant(path) for path in images]
+    compressed = MODEL_DIR / f"{source.stem}.meshopt.glb"
+    if compress_model(source, compressed):
+        variants["meshopt"] = _variant(compressed)
+    if fetch_vendor:
+        fetch_vendor_scripts()
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare locally served digital twin assets.")
+    parser.add_argument("--fetch-vendor", action="store_true",
+                        help="download model-viewer and the meshopt decoder into static/vendor")
+    parser.add_argument("--no-lods", dest="lods", action="store_false",
+                        help="skip the decimated level-of-detail variants")
+    args = parser.parse_args(argv)
+
+    manifest = prepare_assets(fetch_vendor=args.fetch_vendor, lods=args.lods)
+    for name, variant in manifest["variants"].items():
+        detail = (f", {variant['triangles']:,} triangles, {variant['geometry_bytes'] / 1e6:.2f} MB geometry"
+                  if "triangles" in variant else "")
+        print(f"{name:>9}: {variant['file']} ({variant['bytes'] / 1e6:.2f} MB{detail})")
+    for image in manifest.get("images", []):
+        print(f"{'texture':>9}: {image['file']} ({image['bytes'] / 1e6:.2f} MB, shared by the LOD variants)")
+    if "meshopt" not in manifest["variants"]:
+        print("gltfpack not found; only the original model will be served")
+
+
+if __name__ == "__main__":
+    main()
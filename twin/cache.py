@@ -0,0 +1,92 @@
+"""Small thread-safe LRU cache and content-based data versions.
+
+Used by the dashboard to skip rebuilding Plotly figures across reruns and
+sessions; Streamlit still serializes each figure it renders, so the cache
+saves construction, not JSON encoding. Streamlit serves each session from
+its own thread, hence the locks.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def data_version(*arrays):
+    """Stable hex digest of array contents, usable as a cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_build(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheStats:
+    """Hit/miss counters for a cache whose internals are not observable.
+
+    Count every lookup with ``record_call`` and every computation (from
+    inside the cached function, which only runs on a miss) with
+    ``record_miss``.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    @property
+    def hits(self):
+        return max(self.calls - self.misses, 0)
+
+    def hit_ratio(self):
+        return self.hits / self.calls if self.calls else 0.0
@@ -0,0 +1,28 @@
+"""REALISTIC constants shared by the dashboard and the batch engine."""
+
+# Tire pressure thresholds (REALISTIC ranges for heavy vehicles)
+WEAR_THRESHOLD_PRESSURE = 28.0  # Critical UNDER-inflation
+OVERPRESSURE_THRESHOLD = 38.0   # Critical OVER-inflation (would cause blowout)
+OPTIMAL_PRESSURE_RANGE = (30.0, 35.0)  # Ideal operating range
+PRESSURE_ALERT_THRESHOLD = 29.0  # Early warning for under-inflation
+OVERPRESSURE_ALERT = 36.0       # Early warning for over-inflation
+
+# Mileage thresholds (realistic for tire lifespan)
+HIGH_MILEAGE_THRESHOLD = 40000.0  # km - typical tire lifespan
+MILEAGE_ALERT_THRESHOLD = 35000.0  # Early warning
+
+# Temperature thresholds (REALISTIC for tire operation)
+CRITICAL_TEMP_THRESHOLD = 85.0  # °C - dangerous temperature (rubber degradation)
+TEMP_ALERT_THRESHOLD = 75.0     # °C - warning threshold
+OPTIMAL_TEMP_RANGE = (45.0, 70.0)  # Normal operating range
+
+# Business metrics (REALISTIC calculations)
+BASE_MAINTENANCE_COST = 1200    # $ per unplanned maintenance event
+TIRE_REPLACEMENT_COST = 800     # $ per tire
+DAILY_OPERATIONAL_COST = 1200   # $ per day of downtime (heavy equipment)
+CATASTROPHIC_FAILURE_COST = 5000 # $ for catastrophic failure (blowout + damage)
+
+# Simulation data columns (same names as df_sim in the dashboard)
+MILEAGE_COLUMN = 'Mileage (km)'
+PRESSURE_COLUMN = 'Pressure (PSI)'
+TEMPERATURE_COLUMN = 'Temperature (°C)'
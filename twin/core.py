@@ -0,0 +1,72 @@
+"""Headless core of the digital twin.
+
+Thresholds, the risk engine, business metrics and the wear simulator in one
+import that needs only NumPy, so batch workers and tests start in
+milliseconds instead of loading Streamlit and Plotly. pandas is imported
+lazily, only by the DataFrame helpers.
+"""
+from twin.constants import (  # noqa: F401
+    BASE_MAINTENANCE_COST,
+    CATASTROPHIC_FAILURE_COST,
+    CRITICAL_TEMP_THRESHOLD,
+    DAILY_OPERATIONAL_COST,
+    HIGH_MILEAGE_THRESHOLD,
+    MILEAGE_ALERT_THRESHOLD,
+    MILEAGE_COLUMN,
+    OPTIMAL_PRESSURE_RANGE,
+    OPTIMAL_TEMP_RANGE,
+    OVERPRESSURE_ALERT,
+    OVERPRESSURE_THRESHOLD,
+    PRESSURE_ALERT_THRESHOLD,
+    PRESSURE_COLUMN,
+    TEMP_ALERT_THRESHOLD,
+    TEMPERATURE_COLUMN,
+    TIRE_REPLACEMENT_COST,
+    WEAR_THRESHOLD_PRESSURE,
+)
+from twin.fleet import (  # noqa: F401
+    PAGE_SIZE,
+    RANKINGS,
+    FleetSnapshot,
+    fleet_rows,
+    fleet_snapshot,
+    maintenance_due,
+    page_of,
+    simulated_fleet_snapshot,
+    top_k,
+    worst_tires,
+)
+from twin.hierarchy import (  # noqa: F401
+    FleetHierarchy,
+    FleetLayout,
+    color_counts,
+    fleet_layout,
+    load_layout,
+    simulated_layout,
+    worst_status,
+)
+from twin.lut import RiskLUT, default_lut  # noqa: F401
+from twin.metrics import (  # noqa: F401
+    calculate_business_metrics,
+    calculate_business_metrics_batch,
+    maintenance_savings,
+    risk_score_for,
+    summarize_fleet,
+)
+from twin.risk import (  # noqa: F401
+    RiskBatch,
+    decode_critical_issues,
+    predict_wear_and_status,
+    predict_wear_and_status_batch,
+    risk_codes,
+    score_frame,
+)
+from twin.rul import (  # noqa: F401
+    LIMIT_LABELS,
+    RemainingLife,
+    RemainingLifeEstimator,
+    median_time_to_limit,
+    project_remaining_life,
+    simulated_fleet_remaining_life,
+)
+from twin.simulation import SimulationResult, simulate_tires, simulation_frame  # noqa: F401
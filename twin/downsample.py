@@ -0,0 +1,126 @@
+"""Visual-preserving downsampling for the trend chart.
+
+Long tire histories are reduced before they reach Plotly by combining
+three index selections:
+
+* largest-triangle-three-buckets (LTTB) for the overall shape,
+* per-bucket min/max envelopes so short spikes and dips survive,
+* both samples around crossings of the alert thresholds, so a line does
+  not appear to stay on the wrong side of ``WEAR_THRESHOLD_PRESSURE`` or
+  ``CRITICAL_TEMP_THRESHOLD`` (noise hovering on a threshold is thinned to
+  a reserved share of the point budget).
+
+The result never exceeds the point budget.
+
+Inputs are expected to be finite and sorted by ``x``.
+"""
+import numpy as np
+
+POINTS_PER_PIXEL = 2
+DEFAULT_CHART_WIDTH_PX = 1600
+
+
+def points_for_width(width_px=DEFAULT_CHART_WIDTH_PX, points_per_pixel=POINTS_PER_PIXEL):
+    """Point budget per trace for a chart ``width_px`` pixels wide."""
+    return max(3, int(width_px * points_per_pixel))
+
+
+def lttb_indices(x, y, n_out):
+    """Indices chosen by largest-triangle-three-buckets, always keeping both ends."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        start, end = edges[k], edges[k + 1]
+        next_start = end
+        next_end = edges[k + 2] if k + 2 < edges.size else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[k + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    """Index of the minimum and maximum of ``y`` in each of ``n_buckets`` buckets."""
+    y = np.asarray(y, dtype=np.float64)
+    n = y.size
+    if n == 0 or n_buckets <= 0:
+        return np.empty(0, dtype=np.int64)
+    size = -(-n // n_buckets)
+    rows = -(-n // size)
+    padded = np.pad(y, (0, rows * size - n), mode="edge").reshape(rows, size)
+    offsets = np.arange(rows) * size
+    indices = np.concatenate([offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)])
+    return np.minimum(indices, n - 1)
+
+
+def crossing_indices(y, thresholds, bucket_size=None):
+    """Samples on both sides of threshold crossings.
+
+    With ``bucket_size``, only the first and last crossing of each threshold
+    per bucket are kept, so sensor noise hovering on a threshold cannot blow
+    the point budget.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    found = []
+    for threshold in thresholds:
+        above = y >= threshold
+        before = np.flatnonzero(above[1:] != above[:-1])
+        if bucket_size and before.size:
+            bucket = before // bucket_size
+            first = np.unique(bucket, return_index=True)[1]
+            last = before.size - 1 - np.unique(bucket[::-1], return_index=True)[1]
+            before = before[np.union1d(first, last)]
+        found.extend((before, before + 1))
+    return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+def downsample_indices(x, y, max_points, thresholds=()):
+    """Sorted unique indices that keep a trace readable within ``max_points``.
+
+    Threshold crossings come first, from a reserved quarter of the budget
+    (at most two per bucket and threshold, thinned evenly if still over).
+    Half of what is left goes to LTTB and the rest to min/max envelopes, so
+    the result never exceeds ``max_points``.
+    """
+    n = np.size(x)
+    if n <= max_points:
+        return np.arange(n)
+    crossings = np.empty(0, dtype=np.int64)
+    if thresholds:
+        reserved = max_points // 4
+        # Each bucket keeps its first and last crossing of each threshold, two samples apiece
+        buckets = max(1, reserved // (4 * len(thresholds)))
+        crossings = np.unique(crossing_indices(y, thresholds, bucket_size=-(-n // buckets)))
+        if crossings.size > reserved:
+            crossings = crossings[np.linspace(0, crossings.size - 1, reserved).astype(np.int64)]
+    remaining = max_points - crossings.size
+    lttb_points = remaining // 2
+    envelope_buckets = (remaining - lttb_points) // 2
+    return np.unique(np.concatenate([
+        lttb_indices(x, y, lttb_points),
+        minmax_indices(y, envelope_buckets),
+        crossings,
+    ]))
+
+
+def downsample_trace(x, y, max_points=None, thresholds=()):
+    """Return ``(x, y)`` reduced to roughly ``max_points`` samples."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if max_points is None:
+        max_points = points_for_width()
+    indices = downsample_indices(x, y, max_points, thresholds)
+    return x[indices], y[indices]
@@ -0,0 +1,179 @@
+"""Prometheus text-format metrics for the telemetry and scoring pipeline.
+
+``MetricsExporter`` serves ``/metrics`` from a daemon thread. Nothing is
+counted on its behalf: collectors read the counters the pipeline already
+keeps (the telemetry consumer adds one ``bincount`` per scored batch, from
+its single thread) and format them only when a scraper asks.
+
+A collector is a zero-argument callable returning :class:`MetricFamily`
+objects; the ``*_families`` helpers below build them for the telemetry
+service, the drift detector, the render profiler and the caches.
+"""
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+import numpy as np
+
+from twin.anomaly import (
+    ANOMALY_RAPID_PRESSURE_LOSS,
+    ANOMALY_SLOW_LEAK,
+    ANOMALY_THERMAL_DRIFT,
+    ANOMALY_THERMAL_RUNAWAY,
+)
+from twin.risk import STATUS_COLORS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_PORT = 9871
+SUMMARY_QUANTILES = (50, 90, 99)
+
+
+class MetricFamily(NamedTuple):
+    """One metric: ``samples`` are ``(suffix, labels, value)`` triples."""
+    name: str
+    type: str  # counter, gauge or summary
+    help: str
+    samples: list
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    value = float(value)
+    if np.isnan(value):
+        return "NaN"
+    if np.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+
+
+def render(families):
+    """Text exposition format (version 0.0.4) for an iterable of families."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for suffix, labels, value in family.samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            label_text = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{family.name}{suffix}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- collectors ---
+def telemetry_families(service):
+    """Ingest, scoring and queue metrics of a :class:`twin.ingest.TelemetryService`."""
+    scored = {}
+    for color, count in zip(STATUS_COLORS, service.status_counts.tolist()):
+        scored[color] = scored.get(color, 0) + count
+    return [
+        MetricFamily("twin_readings_ingested_total", "counter", "Readings accepted by the telemetry service.",
+                     [("", {}, service.readings_total)]),
+        MetricFamily("twin_readings_scored_total", "counter", "Readings scored, by status colour.",
+                     [("", {"color": color}, count) for color, count in scored.items()]),
+        MetricFamily("twin_readings_rejected_total", "counter",
+                     "Readings dropped for an out-of-range tire id or a non-finite value.",
+                     [("", {}, service.rejected_readings)]),
+        MetricFamily("twin_datagrams_dropped_total", "counter", "Datagrams dropped because the queue was full.",
+                     [("", {}, service.dropped_datagrams)]),
+        MetricFamily("twin_ingest_errors_total", "counter", "Batches that failed to process and were skipped.",
+                     [("", {}, service.ingest_errors)]),
+        MetricFamily("twin_ingest_queue_depth", "gauge", "Datagrams waiting to be scored.",
+                     [("", {}, service.queue_depth())]),
+    ]
+
+
+_ANOMALY_NAMES = {
+    ANOMALY_SLOW_LEAK: "slow_leak",
+    ANOMALY_RAPID_PRESSURE_LOSS: "rapid_pressure_loss",
+    ANOMALY_THERMAL_DRIFT: "thermal_drift",
+    ANOMALY_THERMAL_RUNAWAY: "thermal_runaway",
+}
+
+
+def drift_families(detector):
+    """Tires currently flagged by a :class:`twin.anomaly.DriftDetector`."""
+    return [MetricFamily("twin_tires_anomalous", "gauge", "Tires currently raising each drift anomaly.",
+                         [("", {"anomaly": _ANOMALY_NAMES[bit]}, count)
+                          for bit, count in detector.counts().items()])]
+
+
+def profiler_families(profiler, quantiles=SUMMARY_QUANTILES):
+    """Render durations from a :class:`twin.profiling.Profiler` as one summary."""
+    samples = []
+    for section, stats in profiler.summary(quantiles).items():
+        for q in quantiles:
+            samples.append(("", {"section": section, "quantile": q / 100}, stats[f"p{q}_ms"] / 1000))
+        samples.append(("_sum", {"section": section}, stats["total_ms"] / 1000))
+        samples.append(("_count", {"section": section}, stats["count"]))
+    return [MetricFamily("twin_render_duration_seconds", "summary",
+                         "Dashboard rerun and section durations (quantiles over the recent window).", samples)]
+
+
+def cache_families(caches):
+    """Hit/miss counters and hit ratio for ``{name: cache}`` (LRUCache or CacheStats)."""
+    hits, misses, ratios = [], [], []
+    for name, cache in caches.items():
+        hits.append(("", {"cache": name}, cache.hits))
+        misses.append(("", {"cache": name}, cache.misses))
+        ratios.append(("", {"cache": name}, cache.hit_ratio()))
+    return [
+        MetricFamily("twin_cache_hits_total", "counter", "Cache lookups answered from the cache.", hits),
+        MetricFamily("twin_cache_misses_total", "counter", "Cache lookups that had to compute the value.", misses),
+        MetricFamily("twin_cache_hit_ratio", "gauge", "Hits divided by lookups since start.", ratios),
+    ]
+
+
+# --- HTTP endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    exporter = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.exporter.render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """Serve collector output at ``/metrics`` in a daemon thread."""
+
+    def __init__(self, collectors=(), host="127.0.0.1", port=DEFAULT_PORT):
+        self.collectors = list(collectors)
+        handler = type("MetricsHandler", (_MetricsHandler,), {"exporter": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+        return self
+
+    def render(self):
+        families = []
+        for collector in self.collectors:
+            families.extend(collector())
+        return render(families)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="twin-metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
@@ -0,0 +1,153 @@
+"""Fleet overview: the worst tires out of every tire's latest state.
+
+A fleet of ~20k vehicles carries a few hundred thousand tires. Their latest
+state lives in parallel NumPy columns (one slot per tire), so ranking the
+whole fleet never builds per-tire Python objects. The worst ``k`` tires are
+picked with ``np.argpartition`` in O(n) and only those ``k`` are sorted, and
+the dashboard turns just the visible page of them into table rows.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from twin.metrics import risk_scores
+from twin.risk import STATUS_HIGH_RISK, STATUS_TEXTS, risk_codes
+from twin.rul import LIMIT_LABELS, project_remaining_life
+from twin.simulation import simulate_tires
+
+PAGE_SIZE = 25
+SERVICE_STEPS = 25  # simulated readings before most tires would be replaced
+
+# Ranking keys: (label, column, largest first)
+RANKINGS = {
+    "risk": ("Risk score", "risk_score", True),
+    "time_to_limit": ("Time to threshold", "remaining_km", False),
+}
+
+
+class FleetSnapshot(NamedTuple):
+    """Latest state of every reporting tire, one array element per tire."""
+    tire_id: np.ndarray
+    pressure: np.ndarray
+    temperature: np.ndarray
+    mileage: np.ndarray
+    code: np.ndarray
+    risk_score: np.ndarray
+    remaining_km: np.ndarray
+    remaining_hours: np.ndarray  # NaN when the tire's speed is unknown
+    limit: np.ndarray            # LIMIT_* of the first limit
+
+    def __len__(self):
+        return self.tire_id.size
+
+
+def fleet_snapshot(service):
+    """:class:`FleetSnapshot` of every tire a :class:`twin.ingest.TelemetryService` has heard from."""
+    tire_id = np.flatnonzero(service.updated_at > 0)
+    pressure, temperature, mileage = (column[tire_id] for column in
+                                      (service.pressure, service.temperature, service.mileage))
+    if service.rul is not None:
+        remaining = service.rul.estimate(tire_id)
+    else:
+        remaining = project_remaining_life(pressure, mileage, temperature)
+    return FleetSnapshot(tire_id, pressure, temperature, mileage, service.code[tire_id],
+                         service.risk_score[tire_id], remaining.km, remaining.hours, remaining.limit)
+
+
+def simulated_fleet_snapshot(n_tires=240_000, seed=0, cohorts=10):
+    """Stand-in fleet when no live data is streaming.
+
+    Tires are split into ``cohorts`` with evenly spread ages up to
+    ``SERVICE_STEPS`` readings, so the fleet mixes new and worn tires.
+    Remaining life is projected at the wear model's expected rates.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.diff(np.linspace(0, n_tires, cohorts + 1).astype(np.int64))
+    results = [simulate_tires(int(size), steps=max(1, SERVICE_STEPS * (i + 1) // cohorts),
+                              seed=rng, keep_history=False)
+               for i, size in enumerate(sizes)]
+    pressure, temperature, mileage = (np.concatenate([getattr(r, name) for r in results])
+                                      for name in ("pressure", "temperature", "mileage"))
+    code = risk_codes(pressure, mileage, temperature)[0]
+    remaining = project_remaining_life(pressure, mileage, temperature)
+    return FleetSnapshot(np.arange(n_tires), pressure, temperature, mileage, code,
+                         risk_scores(pressure, mileage, temperature, code, seed),
+                         remaining.km, remaining.hours, remaining.limit)
+
+
+def maintenance_due(snapshot):
+    """Number of tires at high risk or worse."""
+    return int(np.count_nonzero(snapshot.code >= STATUS_HIGH_RISK))
+
+
+def top_k(values, k, largest=True):
+    """Indices of the ``k`` largest (or smallest) values, best first.
+
+    ``np.argpartition`` finds them in linear time; only the ``k`` winners
+    are sorted. NaN values rank last.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keys = -values if largest else values
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    k = min(int(k), keys.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    chosen = np.argpartition(keys, k - 1)[:k] if k < keys.size else np.arange(keys.size)
+    return chosen[np.argsort(keys[chosen], kind="stable")]
+
+
+def worst_tires(snapshot, k, by="risk"):
+    """Snapshot indices of the ``k`` worst tires ranked by ``by`` (a ``RANKINGS`` key).
+
+    Ties on the ranking column are broken by the other column, so tires
+    with equal risk scores list the one closest to a limit first.
+    """
+    _, column, largest = RANKINGS[by]
+    values = getattr(snapshot, column)
+    chosen = top_k(values, k, largest)
+    if chosen.size == 0:
+        return chosen
+    # Re-sort the winners on (primary, secondary); equal primaries may straddle
+    # the partition boundary, which only matters for the last rank
+    other = "remaining_km" if column == "risk_score" else "risk_score"
+    secondary = getattr(snapshot, other)[chosen].astype(np.float64)
+    primary = values[chosen].astype(np.float64)
+    order = np.lexsort((secondary if column == "risk_score" else -secondary,
+                        -primary if largest else primary))
+    return chosen[order]
+
+
+def page_of(indices, page, page_size=PAGE_SIZE):
+    """The ``page``-th (0-based) slice of ``indices``, clamped to the last page."""
+    pages = max(1, -(-len(indices) // page_size))
+    page = min(max(int(page), 0), pages - 1)
+    return indices[page * page_size:(page + 1) * page_size], pages
+
+
+def fleet_rows(snapshot, indices, layout=None):
+    """Table rows (dicts) for the given snapshot indices only.
+
+    With a :class:`twin.hierarchy.FleetLayout`, rows also locate each tire
+    by vehicle, axle and wheel (numbered from 1).
+    """
+    rows = []
+    for i in indices:
+        km, hours = snapshot.remaining_km[i], snapshot.remaining_hours[i]
+        tire = int(snapshot.tire_id[i])
+        row = {"Tire": tire}
+        if layout is not None:
+            axle = layout.tire_axle[tire]
+            row.update({"Vehicle": int(layout.axle_vehicle[axle]), "Axle": int(layout.axle_index[axle]) + 1,
+                        "Wheel": int(layout.tire_wheel[tire]) + 1})
+        rows.append({
+            **row,
+            "Status": str(STATUS_TEXTS[snapshot.code[i]]),
+            "Risk": int(snapshot.risk_score[i]),
+            "Remaining (km)": round(float(km)) if np.isfinite(km) else None,
+            "Remaining (h)": round(float(hours)) if np.isfinite(hours) else None,
+            "Limit": str(LIMIT_LABELS[snapshot.limit[i]]),
+            "Pressure (PSI)": round(float(snapshot.pressure[i]), 1),
+            "Temperature (°C)": round(float(snapshot.temperature[i]), 1),
+            "Mileage (km)": round(float(snapshot.mileage[i])),
+        })
+    return rows
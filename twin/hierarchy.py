@@ -0,0 +1,220 @@
+"""Fleet → vehicle → axle → tire hierarchy with incrementally aggregated state.
+
+The layout is stored as flat index arrays rather than nested objects: each
+tire knows its axle and wheel position, and each axle knows its vehicle and
+position along it. Tire ids are positions in those arrays, the same ids the
+telemetry service uses.
+
+:class:`FleetHierarchy` keeps, for every axle, every vehicle and the fleet,
+the number of tires in each status and the summed maintenance cost avoided.
+A tire update subtracts the tire's old contribution from its three ancestors
+and adds the new one, so the cost of an update depends on the tires that
+changed, never on the size of the fleet. The worst status of a node is read
+from its counts, which have one slot per status.
+
+A real fleet's layout comes from a JSON mapping file (:func:`load_layout`)
+listing each vehicle's wheels per axle; :func:`simulated_layout` stands in
+for it in demos and benchmarks.
+"""
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from twin.metrics import MAINTENANCE_SAVINGS
+from twin.risk import STATUS_COLORS, STATUS_ICONS, STATUS_TEXTS
+
+N_STATUS_CODES = len(STATUS_TEXTS)
+NO_DATA = N_STATUS_CODES  # count slot for tires that have not reported yet
+STATUS_COLOR_NAMES = tuple(dict.fromkeys(STATUS_COLORS))  # green → red, without repeats
+
+# Wheels per axle, front first, for the vehicle types in the simulated fleet
+AXLE_CONFIGS = (
+    (2, 4),           # light truck, dual rear wheels
+    (2, 4, 4),        # tandem-axle rigid truck
+    (2, 2, 4, 4),     # twin-steer rigid truck
+    (2, 4, 4, 4),     # tractor with a single-axle trailer
+    (2, 4, 4, 4, 4),  # tractor-trailer
+)
+
+
+class FleetLayout(NamedTuple):
+    """Parent links of a fleet, one array element per tire or axle."""
+    tire_axle: np.ndarray     # axle of each tire
+    tire_wheel: np.ndarray    # wheel position on its axle, left to right
+    axle_vehicle: np.ndarray  # vehicle of each axle
+    axle_index: np.ndarray    # axle position on its vehicle, front first
+
+    @property
+    def n_tires(self):
+        return self.tire_axle.size
+
+    @property
+    def n_axles(self):
+        return self.axle_vehicle.size
+
+    @property
+    def n_vehicles(self):
+        return int(self.axle_vehicle[-1]) + 1 if self.axle_vehicle.size else 0
+
+
+def _positions(counts):
+    """Parent index and position within the parent for children grouped in runs of ``counts``."""
+    counts = np.asarray(counts, dtype=np.int64)
+    parent = np.repeat(np.arange(counts.size, dtype=np.int32), counts)
+    starts = np.cumsum(counts) - counts
+    return parent, (np.arange(parent.size) - starts[parent]).astype(np.uint8)
+
+
+def fleet_layout(wheels_per_axle, axles_per_vehicle):
+    """:class:`FleetLayout` from wheel counts per axle and axle counts per vehicle.
+
+    Tires and axles are numbered consecutively, vehicle by vehicle.
+    """
+    if np.sum(axles_per_vehicle) != np.size(wheels_per_axle):
+        raise ValueError("axles_per_vehicle must add up to the number of axles")
+    tire_axle, tire_wheel = _positions(wheels_per_axle)
+    axle_vehicle, axle_index = _positions(axles_per_vehicle)
+    return FleetLayout(tire_axle, tire_wheel, axle_vehicle, axle_index)
+
+
+def load_layout(path):
+    """:class:`FleetLayout` from a JSON mapping file.
+
+    The file holds ``{"vehicles": [[2, 4], [2, 4, 4], ...]}``: for each
+    vehicle in tire-id order, its wheels per axle, front first (the shape
+    of :data:`AXLE_CONFIGS`). Tire ids are then assigned consecutively,
+    vehicle by vehicle, axle by axle, left to right.
+    """
+    with open(path, encoding="utf-8") as file:
+        vehicles = json.load(file)["vehicles"]
+    if any(len(axles) == 0 or min(axles) < 1 for axles in vehicles):
+        raise ValueError("every vehicle needs at least one axle with at least one wheel")
+    wheels = np.array([wheels for axles in vehicles for wheels in axles], dtype=np.int64)
+    return fleet_layout(wheels, [len(axles) for axles in vehicles])
+
+
+def simulated_layout(n_tires, seed=0):
+    """Layout of random :data:`AXLE_CONFIGS` vehicles with at least ``n_tires`` tires."""
+    rng = np.random.default_rng(seed)
+    per_vehicle = np.array([sum(config) for config in AXLE_CONFIGS])
+    # Enough draws for n_tires even if every vehicle were the smallest type
+    kinds = rng.integers(0, len(AXLE_CONFIGS), -(-n_tires // per_vehicle.min()))
+    kinds = kinds[:np.searchsorted(np.cumsum(per_vehicle[kinds]), n_tires) + 1]
+    wheels = np.concatenate([AXLE_CONFIGS[kind] for kind in kinds]) if kinds.size else np.empty(0, np.int64)
+    axles = np.array([len(config) for config in AXLE_CONFIGS])[kinds]
+    return fleet_layout(wheels, axles)
+
+
+def worst_status(counts):
+    """Worst reported status code per row of status counts, -1 where no tire has reported."""
+    reported = np.asarray(counts)[..., :N_STATUS_CODES] > 0
+    worst = N_STATUS_CODES - 1 - reported[..., ::-1].argmax(axis=-1)
+    return np.where(reported.any(axis=-1), worst, -1)
+
+
+def color_counts(counts):
+    """``{colour: tires}`` for one row of status counts, green to red."""
+    by_color = dict.fromkeys(STATUS_COLOR_NAMES, 0)
+    for code, color in enumerate(STATUS_COLORS):
+        by_color[color] += int(counts[code])
+    return by_color
+
+
+class FleetHierarchy:
+    """Status counts and cost avoided per axle, vehicle and fleet, updated per tire."""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.tire_vehicle = layout.axle_vehicle[layout.tire_axle]
+        # Tires are numbered vehicle by vehicle, so each vehicle is a slice
+        self.vehicle_start = np.searchsorted(self.tire_vehicle, np.arange(layout.n_vehicles + 1))
+        self.code = np.full(layout.n_tires, NO_DATA, dtype=np.uint8)
+        self.savings = np.zeros(layout.n_tires, dtype=np.int64)
+
+        slots = N_STATUS_CODES + 1
+        self.axle_counts = np.zeros((layout.n_axles, slots), dtype=np.int32)
+        self.axle_counts[:, NO_DATA] = np.bincount(layout.tire_axle, minlength=layout.n_axles)
+        self.vehicle_counts = np.zeros((layout.n_vehicles, slots), dtype=np.int32)
+        self.vehicle_counts[:, NO_DATA] = np.bincount(self.tire_vehicle, minlength=layout.n_vehicles)
+        self.fleet_counts = np.zeros(slots, dtype=np.int64)
+        self.fleet_counts[NO_DATA] = layout.n_tires
+
+        self.axle_savings = np.zeros(layout.n_axles, dtype=np.int64)
+        self.vehicle_savings = np.zeros(layout.n_vehicles, dtype=np.int64)
+        self.fleet_savings = 0
+
+    def update(self, tire_id, code, savings=None):
+        """Set tires' status codes (and cost avoided, by default the status's
+        ``MAINTENANCE_SAVINGS``) and adjust their axle, vehicle and fleet.
+
+        When a tire appears more than once, its last entry wins.
+        """
+        tire_id, code = np.broadcast_arrays(np.asarray(tire_id, dtype=np.intp).ravel(),
+                                            np.asarray(code, dtype=np.uint8).ravel())
+        if savings is None:
+            savings = MAINTENANCE_SAVINGS[code]
+        savings = np.broadcast_to(np.asarray(savings, dtype=np.int64).ravel(), tire_id.shape)
+        if tire_id.size == 0:
+            return
+        # Keep the last entry per tire, then only tires whose state changed
+        tires, first = np.unique(tire_id[::-1], return_index=True)
+        last = tire_id.size - 1 - first
+        code, savings = code[last], savings[last]
+        old_code, old_savings = self.code[tires], self.savings[tires]
+        changed = (code != old_code) | (savings != old_savings)
+        if not changed.any():
+            return
+        tires, code, savings = tires[changed], code[changed], savings[changed]
+        old_code, delta = old_code[changed], savings - old_savings[changed]
+
+        axle, vehicle = self.layout.tire_axle[tires], self.tire_vehicle[tires]
+        for counts, node in ((self.axle_counts, axle), (self.vehicle_counts, vehicle)):
+            np.subtract.at(counts, (node, old_code), 1)
+            np.add.at(counts, (node, code), 1)
+        slots = self.fleet_counts.size
+        self.fleet_counts += np.bincount(code, minlength=slots) - np.bincount(old_code, minlength=slots)
+        np.add.at(self.axle_savings, axle, delta)
+        np.add.at(self.vehicle_savings, vehicle, delta)
+        self.fleet_savings += int(delta.sum())
+
+        self.code[tires] = code
+        self.savings[tires] = savings
+
+    # --- readers ---
+    def axle_status(self, axle=None):
+        """Worst status of the given axles (all by default); -1 before any report."""
+        return worst_status(self.axle_counts if axle is None else self.axle_counts[axle])
+
+    def vehicle_status(self, vehicle=None):
+        """Worst status of the given vehicles (all by default); -1 before any report."""
+        return worst_status(self.vehicle_counts if vehicle is None else self.vehicle_counts[vehicle])
+
+    def fleet_status(self):
+        return int(worst_status(self.fleet_counts))
+
+    def vehicle_color_counts(self):
+        """``{colour: vehicles}`` by each vehicle's worst status."""
+        worst = self.vehicle_status()
+        return color_counts(np.bincount(worst[worst >= 0], minlength=N_STATUS_CODES))
+
+    def vehicle_tires(self, vehicle):
+        """Tire ids of one vehicle, front axle first and left to right."""
+        return np.arange(self.vehicle_start[vehicle], self.vehicle_start[vehicle + 1])
+
+    def vehicle_rows(self, vehicle):
+        """Table rows (dicts), one per axle of ``vehicle``."""
+        tires = self.vehicle_tires(vehicle)
+        axles = np.unique(self.layout.tire_axle[tires])
+        rows = []
+        for axle in axles:
+            wheels = tires[self.layout.tire_axle[tires] == axle]
+            worst = int(self.axle_status(axle))
+            rows.append({
+                "Axle": int(self.layout.axle_index[axle]) + 1,
+                "Wheels": " ".join(STATUS_ICONS[c] if c < N_STATUS_CODES else "·" for c in self.code[wheels]),
+                "Tires": f"{int(wheels[0])}–{int(wheels[-1])}",
+                "Worst status": STATUS_TEXTS[worst] if worst >= 0 else "NO DATA",
+                "Cost avoided ($)": int(self.axle_savings[axle]),
+            })
+        return rows
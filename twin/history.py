@@ -0,0 +1,190 @@
+"""Fixed-memory ring-buffer history of per-tire telemetry.
+
+All tires share one preallocated (tires × capacity) array per column
+(mileage, pressure, temperature, timestamp) plus a head index, size and
+total per tire. A tire gets its row the first time it reports; rows grow by
+doubling, so memory tracks the tires that actually report, at
+``capacity * 20`` bytes each, no matter how long the process runs. A mixed
+batch is written with one fancy-index scatter per column: readings are
+ranked within their tire, only each tire's newest ``capacity`` are kept,
+and each lands at ``(head + rank) % capacity`` of its tire's row.
+
+The store is the short in-memory window behind the live trend chart; the
+full history of every tire goes to :class:`twin.store.TelemetryStore`, so
+the default capacity is sized for one chart, not for analysis.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+DEFAULT_CAPACITY = 256
+INITIAL_ROWS = 64
+
+
+class HistoryWindow(NamedTuple):
+    """The newest samples of one tire, oldest first.
+
+    Windows that do not wrap are read-only views into the ring buffer,
+    which Plotly can consume directly; they become stale once later
+    appends overwrite those slots, so copy them if they must outlive them.
+    """
+    mileage: np.ndarray
+    pressure: np.ndarray
+    temperature: np.ndarray
+    timestamp: np.ndarray
+
+    def __len__(self):
+        return self.mileage.size
+
+
+def _readonly(view):
+    view.flags.writeable = False
+    return view
+
+
+class TireHistory:
+    """One tire's row of a :class:`HistoryStore`."""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def capacity(self):
+        return self._store.capacity
+
+    @property
+    def size(self):
+        """Samples currently held."""
+        return int(self._store._size[self._row])
+
+    @property
+    def total(self):
+        """Samples ever appended."""
+        return int(self._store._total[self._row])
+
+    def __len__(self):
+        return self.size
+
+    def window(self, n=None):
+        """The newest ``n`` samples (all held by default), oldest first.
+
+        Zero-copy views when the samples are contiguous in the row; only a
+        window that wraps past the end of the row is copied.
+        """
+        store, row = self._store, self._row
+        size, head = int(store._size[row]), int(store._head[row])
+        n = size if n is None else max(0, min(n, size))
+        start = (head - n) % store.capacity
+        if start + n <= store.capacity:
+            span = np.s_[start:start + n]
+            return HistoryWindow(*(_readonly(column[row, span]) for column in store._columns))
+        # The window wraps past the end of the row
+        return HistoryWindow(*(np.concatenate((column[row, start:], column[row, :head]))
+                               for column in store._columns))
+
+    def last_km(self, km):
+        """Window covering the last ``km`` kilometres (mileage assumed non-decreasing)."""
+        window = self.window()
+        if len(window) == 0:
+            return window
+        start = int(np.searchsorted(window.mileage, window.mileage[-1] - km, side="left"))
+        return HistoryWindow(*(column[start:] for column in window))
+
+
+class HistoryStore:
+    """Ring buffers of the latest ``capacity`` readings of every tire, one row per tire.
+
+    Tire ids are non-negative integers (the telemetry service's array slots).
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._row_of = np.full(0, -1, dtype=np.int32)  # tire id -> row, -1 before its first reading
+        self._rows = 0
+        self._allocate(INITIAL_ROWS)
+
+    def _allocate(self, rows):
+        """(Re)allocate storage for ``rows`` tires, keeping the rows in use."""
+        old = getattr(self, "_columns", None)
+        columns = (np.full((rows, self.capacity), np.nan, dtype=np.float32),  # mileage
+                   np.full((rows, self.capacity), np.nan, dtype=np.float32),  # pressure
+                   np.full((rows, self.capacity), np.nan, dtype=np.float32),  # temperature
+                   np.full((rows, self.capacity), np.nan, dtype=np.float64))  # timestamp
+        head, size, total = (np.zeros(rows, dtype=np.int64) for _ in range(3))
+        if old is not None:
+            used = self._rows
+            for new_column, old_column in zip(columns, old):
+                new_column[:used] = old_column[:used]
+            head[:used], size[:used], total[:used] = self._head[:used], self._size[:used], self._total[:used]
+        self._head, self._size, self._total = head, size, total
+        self._columns = columns
+
+    @property
+    def nbytes(self):
+        """Bytes held by the sample columns."""
+        return sum(column.nbytes for column in self._columns)
+
+    def __len__(self):
+        return self._rows
+
+    def __contains__(self, tire_id):
+        tire_id = int(tire_id)
+        return 0 <= tire_id < self._row_of.size and self._row_of[tire_id] >= 0
+
+    def get(self, tire_id):
+        """The tire's :class:`TireHistory`, or ``None`` if it has no history."""
+        if tire_id not in self:
+            return None
+        return TireHistory(self, int(self._row_of[int(tire_id)]))
+
+    def _rows_for(self, tire_id):
+        """Row of each reading's tire, giving new tires the next free rows."""
+        if tire_id.min() < 0:
+            raise ValueError("tire ids must be non-negative")
+        top = int(tire_id.max())
+        if top >= self._row_of.size:
+            row_of = np.full(max(top + 1, 2 * self._row_of.size), -1, dtype=np.int32)
+            row_of[:self._row_of.size] = self._row_of
+            self._row_of = row_of
+        rows = self._row_of[tire_id]
+        new = rows < 0
+        if new.any():
+            fresh = np.unique(tire_id[new])
+            needed = self._rows + fresh.size
+            if needed > self._head.size:
+                self._allocate(max(needed, 2 * self._head.size))
+            self._row_of[fresh] = np.arange(self._rows, needed)
+            self._rows = needed
+            rows = self._row_of[tire_id]
+        return rows
+
+    def append_batch(self, tire_id, mileage, pressure, temperature, timestamp):
+        """Write a mixed batch of readings (oldest first) with one scatter per column."""
+        tire_id, mileage, pressure, temperature, timestamp = (
+            np.ravel(column) for column in np.broadcast_arrays(tire_id, mileage, pressure, temperature, timestamp))
+        n = tire_id.size
+        if n == 0:
+            return
+        rows = self._rows_for(tire_id.astype(np.intp, copy=False))
+
+        # Group readings by row, keeping batch order within each tire
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+        counts = np.diff(np.append(starts, n))
+        tires = sorted_rows[starts]
+        rank = np.arange(n) - np.repeat(starts, counts)
+
+        # Only each tire's newest `capacity` readings survive the batch
+        keep = rank >= np.repeat(counts, counts) - self.capacity
+        order, rank, target = order[keep], rank[keep], sorted_rows[keep]
+        slot = (self._head[target] + rank) % self.capacity
+        for column, values in zip(self._columns, (mileage, pressure, temperature, timestamp)):
+            column[target, slot] = values[order]
+
+        self._head[tires] = (self._head[tires] + counts) % self.capacity
+        self._size[tires] = np.minimum(self._size[tires] + counts, self.capacity)
+        self._total[tires] += counts
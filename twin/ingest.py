@@ -0,0 +1,264 @@
+"""Streaming telemetry ingestion over UDP with asyncio.
+
+Sensors (or the ``send_readings`` helper) push packed binary readings to a
+local UDP port. Datagrams are queued by the protocol, drained in batches by
+an asyncio consumer and scored with the vectorized risk engine. The service
+runs its event loop in a daemon thread and publishes an immutable snapshot,
+so Streamlit reruns read the latest state without ever blocking on I/O.
+
+Wire format: little-endian records of ``READING_DTYPE`` (16 bytes each),
+any number of records per datagram.
+"""
+import asyncio
+import logging
+import socket
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from twin.metrics import maintenance_savings, risk_scores
+from twin.risk import risk_codes
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9870
+
+READING_DTYPE = np.dtype([
+    ("tire_id", "<u4"),
+    ("pressure", "<f4"),     # PSI
+    ("temperature", "<f4"),  # °C
+    ("mileage", "<f4"),      # km
+])
+MAX_RECORDS_PER_DATAGRAM = 1024  # 16 KB, well under the UDP payload limit
+RECEIVE_BUFFER_BYTES = 8 * 1024 * 1024  # absorb bursts while a batch is scored
+
+N_STATUS_CODES = 5
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetrySnapshot(NamedTuple):
+    """Latest reading seen by the service plus running totals."""
+    tire_id: int
+    pressure: float
+    temperature: float
+    mileage: float
+    code: int
+    timestamp: float
+    readings_total: int
+    status_counts: tuple
+
+
+class _ReadingProtocol(asyncio.DatagramProtocol):
+    def __init__(self, service):
+        self.service = service
+
+    def datagram_received(self, data, addr):
+        try:
+            self.service._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.service.dropped_datagrams += 1
+
+
+class TelemetryService:
+    """Background UDP consumer that keeps per-tire latest state in arrays."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_tires=65536,
+                 batch_size=8192, queue_size=4096, history=None, drift=None, rul=None,
+                 store=None, hierarchy=None):
+        self.host = host
+        self.port = port
+        self.max_tires = max_tires
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.history = history  # optional twin.history.HistoryStore
+        self.drift = drift      # optional twin.anomaly.DriftDetector
+        self.rul = rul          # optional twin.rul.RemainingLifeEstimator
+        self.store = store      # optional twin.store.TelemetryStore (full history on disk)
+        self.hierarchy = hierarchy  # optional twin.hierarchy.FleetHierarchy covering max_tires
+
+        # Latest state per tire, indexed by tire_id
+        self.pressure = np.full(max_tires, np.nan, dtype=np.float32)
+        self.temperature = np.full(max_tires, np.nan, dtype=np.float32)
+        self.mileage = np.full(max_tires, np.nan, dtype=np.float32)
+        self.code = np.zeros(max_tires, dtype=np.uint8)
+        self.risk_score = np.zeros(max_tires, dtype=np.uint8)
+        self.updated_at = np.zeros(max_tires, dtype=np.float64)
+
+        self.readings_total = 0
+        self.dropped_datagrams = 0
+        self.rejected_readings = 0
+        self.ingest_errors = 0  # batches that raised while being processed
+        self.status_counts = np.zeros(N_STATUS_CODES, dtype=np.int64)
+        self._snapshot = None
+
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # --- lifecycle ---
+    def start(self, timeout=5.0):
+        """Bind the socket and start consuming in a daemon thread."""
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="twin-telemetry", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            transport, _ = self._loop.run_until_complete(self._loop.create_datagram_endpoint(
+                lambda: _ReadingProtocol(self), local_addr=(self.host, self.port)))
+            self.port = transport.get_extra_info("sockname")[1]
+            transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        except OSError as exc:
+            self._error = exc
+            self._ready.set()
+            self._loop.close()
+            return
+        consumer = self._loop.create_task(self._consume())
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            consumer.cancel()
+            transport.close()
+            self._loop.run_until_complete(asyncio.gather(consumer, return_exceptions=True))
+            self._loop.close()
+
+    async def _consume(self):
+        record_size = READING_DTYPE.itemsize
+        while True:
+            chunks = [await self._queue.get()]
+            pending = len(chunks[0]) // record_size
+            while pending < self.batch_size and not self._queue.empty():
+                chunk = self._queue.get_nowait()
+                chunks.append(chunk)
+                pending += len(chunk) // record_size
+            payload = b"".join(chunk[:len(chunk) - len(chunk) % record_size] for chunk in chunks)
+            # A bad batch is logged and counted; it must not end the consumer
+            try:
+                self.process(np.frombuffer(payload, dtype=READING_DTYPE))
+            except Exception:
+                self.ingest_errors += 1
+                logger.exception("failed to process a batch of %d readings", len(payload) // record_size)
+
+    # --- scoring ---
+    def process(self, readings):
+        """Score a structured array of ``READING_DTYPE`` and update state.
+
+        Public so in-process producers can bypass the socket.
+        """
+        if readings.size == 0:
+            return
+        tire_id = readings["tire_id"]
+        # Out-of-range tire ids and non-finite values (e.g. a NaN from a failed sensor) are rejected
+        valid = ((tire_id < self.max_tires) & np.isfinite(readings["pressure"])
+                 & np.isfinite(readings["temperature"]) & np.isfinite(readings["mileage"]))
+        if not valid.all():
+            self.rejected_readings += int((~valid).sum())
+            readings = readings[valid]
+            tire_id = readings["tire_id"]
+            if readings.size == 0:
+                return
+
+        code = risk_codes(readings["pressure"], readings["mileage"], readings["temperature"])[0]
+        now = time.time()
+
+        # Keep only the last reading per tire in this batch
+        reversed_ids = tire_id[::-1]
+        tires, first = np.unique(reversed_ids, return_index=True)
+        last = readings.size - 1 - first
+        self.pressure[tires] = readings["pressure"][last]
+        self.temperature[tires] = readings["temperature"][last]
+        self.mileage[tires] = readings["mileage"][last]
+        self.code[tires] = code[last]
+        self.risk_score[tires] = risk_scores(self.pressure[tires], self.mileage[tires],
+                                             self.temperature[tires], code[last])
+        self.updated_at[tires] = now
+        if self.history is not None:
+            self.history.append_batch(tire_id, readings["mileage"], readings["pressure"],
+                                      readings["temperature"], now)
+        if self.store is not None:
+            self.store.append_batch(tire_id, readings["mileage"], readings["pressure"],
+                                    readings["temperature"], now)
+        if self.drift is not None:
+            self.drift.update(tire_id, readings["pressure"], readings["temperature"], readings["mileage"])
+        if self.hierarchy is not None:
+            self.hierarchy.update(tires, code[last], maintenance_savings(code[last], self.mileage[tires]))
+        if self.rul is not None:
+            self.rul.update(tire_id, readings["pressure"], readings["temperature"], readings["mileage"], now)
+
+        self.readings_total += int(readings.size)
+        self.status_counts += np.bincount(code, minlength=N_STATUS_CODES)
+        latest = readings[-1]
+        self._snapshot = TelemetrySnapshot(
+            tire_id=int(latest["tire_id"]),
+            pressure=float(latest["pressure"]),
+            temperature=float(latest["temperature"]),
+            mileage=float(latest["mileage"]),
+            code=int(code[-1]),
+            timestamp=now,
+            readings_total=self.readings_total,
+            status_counts=tuple(int(c) for c in self.status_counts),
+        )
+
+    # --- readers (safe to call from Streamlit reruns) ---
+    def snapshot(self):
+        """Most recent :class:`TelemetrySnapshot`, or ``None`` before any data."""
+        return self._snapshot
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def tire_state(self, tire_id):
+        """Latest reading for one tire, or ``None`` if it has not reported."""
+        if not 0 <= tire_id < self.max_tires or self.updated_at[tire_id] == 0:
+            return None
+        return {
+            "pressure": float(self.pressure[tire_id]),
+            "temperature": float(self.temperature[tire_id]),
+            "mileage": float(self.mileage[tire_id]),
+            "code": int(self.code[tire_id]),
+            "timestamp": float(self.updated_at[tire_id]),
+        }
+
+
+def pack_readings(tire_id, pressure, temperature, mileage):
+    """Pack reading arrays into a ``READING_DTYPE`` structured array."""
+    tire_id, pressure, temperature, mileage = np.broadcast_arrays(tire_id, pressure, temperature, mileage)
+    readings = np.empty(tire_id.shape, dtype=READING_DTYPE)
+    readings["tire_id"] = tire_id
+    readings["pressure"] = pressure
+    readings["temperature"] = temperature
+    readings["mileage"] = mileage
+    return readings.ravel()
+
+
+def send_readings(readings, host=DEFAULT_HOST, port=DEFAULT_PORT, sock=None):
+    """Send packed readings to a :class:`TelemetryService` over UDP."""
+    own_socket = sock is None
+    if own_socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for start in range(0, readings.size, MAX_RECORDS_PER_DATAGRAM):
+            sock.sendto(readings[start:start + MAX_RECORDS_PER_DATAGRAM].tobytes(), (host, port))
+    finally:
+        if own_socket:
+            sock.close()
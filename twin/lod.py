@@ -0,0 +1,340 @@
+"""Level-of-detail variants of the twin's GLB model.
+
+The viewer is a few hundred pixels tall, so most of the source mesh's
+triangles never reach a pixel. This offline pipeline (run from
+``python -m twin.assets``) reads the GLB with NumPy only and writes
+decimated copies:
+
+* Decimation is vertex clustering. Vertices are snapped to a uniform grid
+  and merged per cell, and their attributes are averaged. Triangles that
+  collapse are dropped. Vertices on different UV charts or facing
+  different axis directions are not merged, so texture seams and the two
+  sides of thin walls survive. The grid resolution is bisected to reach
+  each level's triangle budget.
+* Attributes are quantized with ``KHR_mesh_quantization``. Positions are
+  int16, dequantized by a node transform. Normals and tangents are
+  normalized int8, and texture coordinates are normalized uint16.
+* Textures are written once, next to the model, and every level references
+  them. Switching levels then never downloads the images again.
+"""
+import copy
+import json
+import struct
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+GLB_MAGIC = b"glTF"
+CHUNK_JSON = b"JSON"
+CHUNK_BIN = b"BIN\x00"
+QUANTIZATION = "KHR_mesh_quantization"
+
+COMPONENT_DTYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32,
+                    5126: np.float32}
+COMPONENT_TYPES = {np.dtype(dtype): code for code, dtype in COMPONENT_DTYPES.items()}
+TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp", "image/ktx2": ".ktx2"}
+
+MAX_RESOLUTION = 1023  # grid cells per axis; cell keys pack into 10 bits
+
+
+class LodLevel(NamedTuple):
+    name: str
+    triangle_ratio: float  # share of the source triangles to keep
+    max_pixels: int        # largest rendered size (device pixels) the level is meant for
+
+
+# Coarsest first, the order the viewer checks them in
+LOD_LEVELS = (
+    LodLevel("lod2", 0.08, 640),
+    LodLevel("lod1", 0.30, 1400),
+)
+
+
+class LodReport(NamedTuple):
+    name: str
+    triangles: int
+    vertices: int
+    geometry_bytes: int  # vertex and index data
+    file_bytes: int
+
+
+# --- GLB container ---
+def read_glb(path):
+    """``(gltf JSON dict, binary chunk bytes)`` of a GLB file."""
+    data = Path(path).read_bytes()
+    magic, version, length = struct.unpack_from("<4sII", data, 0)
+    if magic != GLB_MAGIC or version != 2:
+        raise ValueError(f"{path} is not a glTF 2.0 binary")
+    gltf, binary, offset = None, b"", 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<I4s", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk)
+        elif chunk_type == CHUNK_BIN:
+            binary = chunk
+        offset += 8 + chunk_length
+    return gltf, binary
+
+
+def write_glb(path, gltf, binary):
+    """Write a GLB; both chunks are padded to 4 bytes as the container requires."""
+    text = json.dumps(gltf, separators=(",", ":")).encode()
+    text += b" " * (-len(text) % 4)
+    binary = bytes(binary) + b"\0" * (-len(binary) % 4)
+    chunks = struct.pack("<I4s", len(text), CHUNK_JSON) + text
+    if binary:
+        chunks += struct.pack("<I4s", len(binary), CHUNK_BIN) + binary
+    Path(path).write_bytes(struct.pack("<4sII", GLB_MAGIC, 2, 12 + len(chunks)) + chunks)
+
+
+def read_accessor(gltf, binary, index):
+    """Accessor as a float64 (count, width) array; normalized integers are scaled to [-1, 1] / [0, 1]."""
+    accessor = gltf["accessors"][index]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    width = TYPE_WIDTHS[accessor["type"]]
+    stride = view.get("byteStride") or dtype.itemsize * width
+    values = np.ndarray((accessor["count"], width), dtype=dtype, buffer=binary,
+                        offset=view.get("byteOffset", 0) + accessor.get("byteOffset", 0),
+                        strides=(stride, dtype.itemsize)).astype(np.float64)
+    if accessor.get("normalized") and dtype.kind in "iu":
+        values = np.maximum(values / np.iinfo(dtype).max, -1.0)
+    return values
+
+
+# --- decimation ---
+def _direction_bucket(normals):
+    """Dominant axis and sign of each normal (0-5)."""
+    axis = np.abs(normals).argmax(axis=1)
+    return axis * 2 + (normals[np.arange(normals.shape[0]), axis] < 0)
+
+
+def cluster_vertices(attributes, resolution):
+    """Cluster id of each vertex on a ``resolution``-cell grid over the mesh bounds."""
+    positions = attributes["POSITION"]
+    low = positions.min(axis=0)
+    cell = max(float((positions.max(axis=0) - low).max()), 1e-12) / resolution
+    grid = np.clip(((positions - low) / cell).astype(np.int64), 0, resolution - 1)
+    key = grid[:, 0] | grid[:, 1] << 10 | grid[:, 2] << 20
+    if "TEXCOORD_0" in attributes:
+        chart = np.clip((attributes["TEXCOORD_0"] * resolution).astype(np.int64) % (MAX_RESOLUTION + 1),
+                        0, MAX_RESOLUTION)
+        key |= chart[:, 0] << 30 | chart[:, 1] << 40
+    if "NORMAL" in attributes:
+        key |= _direction_bucket(attributes["NORMAL"]) << 50
+    return np.unique(key, return_inverse=True)[1].ravel()
+
+
+def decimate(attributes, indices, resolution):
+    """Vertex-clustered ``(attributes, indices)`` at one grid resolution."""
+    cluster = cluster_vertices(attributes, resolution)
+    triangles = cluster[indices.reshape(-1, 3)]
+    keep = ((triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2])
+            & (triangles[:, 0] != triangles[:, 2]))
+    triangles = triangles[keep]
+    # Drop faces that collapsed onto an existing one (same corners, any order)
+    _, unique = np.unique(np.sort(triangles, axis=1), axis=0, return_index=True)
+    triangles = triangles[np.sort(unique)]
+
+    used, remap = np.unique(triangles, return_inverse=True)
+    counts = np.bincount(cluster)
+    merged = {}
+    for name, values in attributes.items():
+        sums = np.column_stack([np.bincount(cluster, weights=column) for column in values.T])
+        mean = sums[used] / counts[used, None]
+        if name == "NORMAL":
+            mean /= np.maximum(np.linalg.norm(mean, axis=1, keepdims=True), 1e-12)
+        elif name == "TANGENT":
+            mean[:, :3] /= np.maximum(np.linalg.norm(mean[:, :3], axis=1, keepdims=True), 1e-12)
+            mean[:, 3] = np.where(mean[:, 3] < 0, -1.0, 1.0)
+        merged[name] = mean
+    return merged, remap.reshape(-1).astype(np.uint32)
+
+
+def decimate_to(attributes, indices, target_triangles):
+    """Decimate at the finest grid resolution whose result fits ``target_triangles``."""
+    low, high = 2, MAX_RESOLUTION
+    best = decimate(attributes, indices, low)
+    while low < high:
+        middle = (low + high + 1) // 2
+        candidate = decimate(attributes, indices, middle)
+        if candidate[1].size // 3 <= target_triangles:
+            low, best = middle, candidate
+        else:
+            high = middle - 1
+    return best
+
+
+# --- quantized GLB writer ---
+class _BinaryWriter:
+    def __init__(self):
+        self.data = bytearray()
+        self.views = []
+
+    def add(self, payload, target=None, stride=None, name=None):
+        self.data += b"\0" * (-len(self.data) % 4)
+        view = {"buffer": 0, "byteOffset": len(self.data), "byteLength": len(payload)}
+        if target is not None:
+            view["target"] = target
+        if stride is not None:
+            view["byteStride"] = stride
+        if name is not None:
+            view["name"] = name
+        self.data += payload
+        self.views.append(view)
+        return len(self.views) - 1
+
+
+def _quantize(name, values):
+    """``(quantized values, normalized flag)`` for a non-position attribute."""
+    if name in ("NORMAL", "TANGENT"):
+        return np.round(np.clip(values, -1, 1) * 127).astype(np.int8), True
+    if name.startswith("TEXCOORD") and values.min() >= 0 and values.max() <= 1:
+        return np.round(values * 65535).astype(np.uint16), True
+    return values.astype(np.float32), False
+
+
+def _padded(values):
+    """Rows padded to a multiple of 4 bytes, as vertex attributes require."""
+    row = values.dtype.itemsize * values.shape[1]
+    pad = -row % 4
+    if pad == 0:
+        return values.tobytes(), row
+    rows = np.zeros((values.shape[0], row + pad), dtype=np.uint8)
+    rows[:, :row] = values.view(np.uint8).reshape(values.shape[0], row)
+    return rows.tobytes(), row + pad
+
+
+def _accessor(gltf, view, values, normalized=False, bounds=False):
+    width = values.shape[1] if values.ndim == 2 else 1
+    accessor = {"bufferView": view, "componentType": COMPONENT_TYPES[values.dtype], "count": int(values.shape[0]),
+                "type": next(kind for kind, size in TYPE_WIDTHS.items() if size == width)}
+    if normalized:
+        accessor["normalized"] = True
+    if bounds:
+        accessor["min"] = values.reshape(values.shape[0], width).min(axis=0).tolist()
+        accessor["max"] = values.reshape(values.shape[0], width).max(axis=0).tolist()
+    gltf["accessors"].append(accessor)
+    return len(gltf["accessors"]) - 1
+
+
+def build_lod(gltf, binary, ratio, image_uris):
+    """``(gltf, binary, triangles, vertices, geometry bytes)`` of one quantized level.
+
+    ``image_uris`` replaces every embedded image with an external file.
+    """
+    out = copy.deepcopy(gltf)
+    out["accessors"] = []
+    writer = _BinaryWriter()
+    triangles = vertices = 0
+    dequantize = {}
+    for mesh_index, mesh in enumerate(out["meshes"]):
+        primitives = []
+        for primitive in mesh["primitives"]:
+            if primitive.get("mode", 4) != 4 or "indices" not in primitive:
+                raise ValueError("only indexed triangle meshes are supported")
+            attributes = {name: read_accessor(gltf, binary, index) for name, index in primitive["attributes"].items()}
+            indices = read_accessor(gltf, binary, primitive["indices"]).astype(np.int64).ravel()
+            primitives.append((primitive, *decimate_to(attributes, indices, max(1, int(indices.size // 3 * ratio)))))
+        # One int16 grid per mesh, so all its primitives share the node transform
+        positions = np.concatenate([attributes["POSITION"] for _, attributes, _ in primitives])
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        # Symmetric int16 range, so the extreme vertices land on +/-32767 instead of wrapping
+        scale = max(float((high - low).max()), 1e-12) / 65534
+        offset = (low + high) / 2
+        dequantize[mesh_index] = (offset, scale)
+        for primitive, attributes, indices in primitives:
+            for name, values in attributes.items():
+                if name == "POSITION":
+                    quantized = np.clip(np.round((values - offset) / scale), -32767, 32767).astype(np.int16)
+                    normalized = False
+                    error = np.abs(quantized * scale + offset - values).max(initial=0.0)
+                    if error > scale / 2 * (1 + 1e-6):
+                        raise ValueError(f"position quantization error {error} > {scale / 2}")
+                else:
+                    quantized, normalized = _quantize(name, values)
+                payload, stride = _padded(quantized)
+                view = writer.add(payload, ARRAY_BUFFER, stride if stride != quantized.itemsize * quantized.shape[1]
+                                  else None)
+                primitive["attributes"][name] = _accessor(out, view, quantized, normalized, bounds=name == "POSITION")
+            index_values = indices.astype(np.uint16 if attributes["POSITION"].shape[0] <= 65535 else np.uint32)
+            primitive["indices"] = _accessor(out, writer.add(index_values.tobytes(), ELEMENT_ARRAY_BUFFER),
+                                             index_values)
+            triangles += indices.size // 3
+            vertices += attributes["POSITION"].shape[0]
+    geometry_bytes = len(writer.data)
+
+    # Mesh nodes move under a child node that scales int16 positions back to model units
+    for node in list(out.get("nodes", [])):
+        if "mesh" in node:
+            mesh = node.pop("mesh")
+            offset, scale = dequantize[mesh]
+            out["nodes"].append({"mesh": mesh, "translation": offset.tolist(), "scale": [scale] * 3})
+            node.setdefault("children", []).append(len(out["nodes"]) - 1)
+
+    for image, uri in zip(out.get("images", []), image_uris):
+        image.pop("bufferView", None)
+        image.pop("mimeType", None)
+        image["uri"] = uri
+    out["bufferViews"] = writer.views
+    out["buffers"] = [{"byteLength": len(writer.data)}]
+    for key in ("extensionsUsed", "extensionsRequired"):
+        out[key] = sorted(set(out.get(key, [])) | {QUANTIZATION})
+    return out, bytes(writer.data), triangles, vertices, geometry_bytes
+
+
+def export_images(gltf, binary, directory, stem):
+    """Write embedded images next to the model; returns their file paths."""
+    paths = []
+    for index, image in enumerate(gltf.get("images", [])):
+        if "bufferView" not in image:
+            raise ValueError("LOD levels can only share embedded images")
+        view = gltf["bufferViews"][image["bufferView"]]
+        start = view.get("byteOffset", 0)
+        path = Path(directory) / f"{stem}.image{index}{IMAGE_EXTENSIONS.get(image.get('mimeType'), '.bin')}"
+        path.write_bytes(binary[start:start + view["byteLength"]])
+        paths.append(path)
+    return paths
+
+
+def geometry_bytes(gltf):
+    """Bytes of vertex and index data (buffer views that are not images)."""
+    image_views = {image["bufferView"] for image in gltf.get("images", []) if "bufferView" in image}
+    return sum(view["byteLength"] for index, view in enumerate(gltf["bufferViews"]) if index not in image_views)
+
+
+def triangle_count(gltf):
+    return sum(gltf["accessors"][primitive["indices"]]["count"] // 3
+               for mesh in gltf["meshes"] for primitive in mesh["primitives"])
+
+
+def vertex_count(gltf):
+    return sum(gltf["accessors"][primitive["attributes"]["POSITION"]]["count"]
+               for mesh in gltf["meshes"] for primitive in mesh["primitives"])
+
+
+def build_lods(source, levels=LOD_LEVELS, image_uri=None):
+    """Write every level next to ``source``; returns ``(reports, level files, image files)``.
+
+    ``image_uri(path)`` maps an exported image to the URI the levels store
+    (default: the bare file name, resolved next to the level's GLB).
+    """
+    source = Path(source)
+    gltf, binary = read_glb(source)
+    images = export_images(gltf, binary, source.parent, source.stem)
+    uris = [image_uri(path) if image_uri else path.name for path in images]
+    reports = [LodReport("original", triangle_count(gltf), vertex_count(gltf), geometry_bytes(gltf),
+                         source.stat().st_size)]
+    files = []
+    for level in levels:
+        target = source.with_name(f"{source.stem}.{level.name}.glb")
+        lod, lod_binary, triangles, vertices, geometry = build_lod(gltf, binary, level.triangle_ratio, uris)
+        write_glb(target, lod, lod_binary)
+        reports.append(LodReport(level.name, triangles, vertices, geometry, target.stat().st_size))
+        files.append(target)
+    return reports, files, images
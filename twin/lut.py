@@ -0,0 +1,108 @@
+"""Precomputed risk classification over the quantized sensor space.
+
+The dashboard sliders only produce pressure 25–40 PSI in 0.1 steps,
+mileage 0–50,000 km in 500 km steps and temperature 30–90 °C in 0.5 steps.
+:class:`RiskLUT` evaluates :func:`twin.risk.risk_codes` once on that whole
+151 × 101 × 121 grid (1.8 MB) and stores, per cell, the status code in the
+low three bits and the critical issue bits above them. Classifying a reading
+is then one array index. Readings that are not exactly on a grid point (live
+sensor values, out-of-range inputs) fall back to the rule engine, so results
+always match it.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from twin.risk import STATUS_COLORS, STATUS_ICONS, STATUS_TEXTS, predict_wear_and_status, risk_codes
+
+PRESSURE_GRID = (25.0, 40.0, 0.1)   # start, stop, step (PSI)
+MILEAGE_GRID = (0.0, 50000.0, 500.0)  # km
+TEMP_GRID = (30.0, 90.0, 0.5)       # °C
+
+_CODE_BITS = 3
+_CODE_MASK = (1 << _CODE_BITS) - 1
+
+
+def _axis(start, stop, step):
+    # Rounded to the step's decimals so grid values equal the slider literals
+    decimals = max(0, -int(np.floor(np.log10(step))))
+    return np.round(start + np.arange(int(round((stop - start) / step)) + 1) * step, decimals)
+
+
+class RiskLUT:
+    """Status code and critical issue bits for every on-grid reading."""
+
+    def __init__(self, pressure_grid=PRESSURE_GRID, mileage_grid=MILEAGE_GRID, temp_grid=TEMP_GRID):
+        grids = (pressure_grid, mileage_grid, temp_grid)
+        self.axes = tuple(_axis(*grid) for grid in grids)
+        self._origins = tuple(grid[0] for grid in grids)
+        self._inverse_steps = tuple(1.0 / grid[2] for grid in grids)
+        code, critical_issues, _ = risk_codes(*np.ix_(*self.axes))
+        self.table = (code | (critical_issues << _CODE_BITS)).astype(np.uint8)
+
+        # Flat views for the lookups: table.ravel()[(i * nj + j) * nk + k]
+        self._flat = self.table.ravel()
+        self._strides = (self.axes[1].size * self.axes[2].size, self.axes[2].size)
+        # Scalar path: exact value -> index (NaN never matches a key)
+        self._positions = tuple({value: index for index, value in enumerate(axis.tolist())} for axis in self.axes)
+        self._flat_bytes = self._flat.tobytes()
+        self._results = [(STATUS_TEXTS[c], STATUS_COLORS[c], STATUS_ICONS[c]) for c in range(len(STATUS_TEXTS))]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def _index(self, values, axis):
+        """Clipped grid index per value and whether the value is that grid point."""
+        grid = self.axes[axis]
+        with np.errstate(invalid="ignore"):
+            index = np.rint((values - self._origins[axis]) * self._inverse_steps[axis]).astype(np.int32)
+        np.clip(index, 0, grid.size - 1, out=index)
+        return index, grid[index] == values
+
+    def lookup(self, pressure, mileage, temp):
+        """Return ``(code, critical_issues)`` uint8 arrays, like :func:`risk_codes`."""
+        pressure, mileage, temp = np.broadcast_arrays(
+            np.asarray(pressure, dtype=np.float64),
+            np.asarray(mileage, dtype=np.float64),
+            np.asarray(temp, dtype=np.float64),
+        )
+        shape = pressure.shape
+        pressure, mileage, temp = pressure.ravel(), mileage.ravel(), temp.ravel()
+        i, on_grid = self._index(pressure, 0)
+        j, on_mileage = self._index(mileage, 1)
+        k, on_temp = self._index(temp, 2)
+        on_grid &= on_mileage
+        on_grid &= on_temp
+        i *= self._strides[0]
+        j *= self._strides[1]
+        i += j
+        i += k
+        packed = self._flat.take(i)
+
+        if not on_grid.all():
+            off_grid = ~on_grid
+            code, critical_issues, _ = risk_codes(pressure[off_grid], mileage[off_grid], temp[off_grid])
+            packed[off_grid] = code | (critical_issues << _CODE_BITS)
+        packed = packed.reshape(shape)
+        return packed & _CODE_MASK, packed >> _CODE_BITS
+
+    def codes(self, pressure, mileage, temp):
+        """Status codes only."""
+        return self.lookup(pressure, mileage, temp)[0]
+
+    def predict(self, pressure, mileage, temp):
+        """Drop-in for ``predict_wear_and_status`` on one reading."""
+        pressure_positions, mileage_positions, temp_positions = self._positions
+        i = pressure_positions.get(pressure)
+        j = mileage_positions.get(mileage)
+        k = temp_positions.get(temp)
+        if i is None or j is None or k is None:
+            return predict_wear_and_status(pressure, mileage, temp)
+        return self._results[self._flat_bytes[i * self._strides[0] + j * self._strides[1] + k] & _CODE_MASK]
+
+
+@lru_cache(maxsize=None)
+def default_lut():
+    """Process-wide :class:`RiskLUT` over the slider ranges, built on first use."""
+    return RiskLUT()
@@ -0,0 +1,181 @@
+"""Vectorized business metrics with deterministic risk scores.
+
+``calculate_business_metrics`` used to draw ``risk_score`` from
+``random.randint``. Scores are now derived from a hash of the (quantized)
+readings and an optional seed, so the same reading always yields the same
+score and fleet totals are reproducible.
+"""
+import numpy as np
+
+from twin.constants import (
+    HIGH_MILEAGE_THRESHOLD,
+    OPTIMAL_PRESSURE_RANGE,
+    OPTIMAL_TEMP_RANGE,
+)
+from twin.risk import risk_codes
+
+# Per-status tables, indexed by twin.risk STATUS_* code
+MAINTENANCE_SAVINGS = np.array([1800, 2400, 3600, 4800, 4800], dtype=np.int64)
+UPTIME = np.array([98.2, 96.5, 94.0, 89.0, 89.0])
+RISK_SCORE_LOW = np.array([15, 35, 60, 85, 85], dtype=np.int64)
+RISK_SCORE_HIGH = np.array([25, 50, 75, 98, 98], dtype=np.int64)
+
+STATUS_CODES_BY_COLOR = {"green": 0, "yellow": 1, "orange": 2, "red": 3}
+
+END_OF_LIFE_SAVINGS = 800  # $ - avoiding tire replacement
+END_OF_LIFE_UPTIME_LOSS = 2.0
+
+
+def _mix64(x):
+    """splitmix64 finalizer over a uint64 array (wrap-around arithmetic)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _quantize(values, scale):
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+    return np.rint(values * scale).astype(np.int64).view(np.uint64)
+
+
+def risk_scores(pressure, mileage, temp, code, seed=0):
+    """Deterministic risk score in the range for each status code.
+
+    Readings are quantized to 0.01 PSI, 1 km and 0.01 °C before hashing, so
+    float noise below sensor resolution does not change the score. ``seed``
+    is a non-negative integer selecting an independent score stream.
+    """
+    pressure, mileage, temp, code = np.broadcast_arrays(
+        np.atleast_1d(pressure), np.atleast_1d(mileage), np.atleast_1d(temp), np.atleast_1d(code)
+    )
+    code = code.astype(np.intp)
+    h = _mix64(np.full(pressure.shape, np.uint64(seed), dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15))
+    h = _mix64(h ^ _quantize(pressure, 100))
+    h = _mix64(h ^ _quantize(mileage, 1))
+    h = _mix64(h ^ _quantize(temp, 100))
+    low = RISK_SCORE_LOW[code]
+    width = (RISK_SCORE_HIGH[code] - low + 1).astype(np.uint64)
+    return low + (h % width).astype(np.int64)
+
+
+def risk_score_for(pressure, mileage, temp, status_color, seed=0):
+    """Scalar :func:`risk_scores` keyed on a status colour, for the dashboard."""
+    code = STATUS_CODES_BY_COLOR.get(status_color, STATUS_CODES_BY_COLOR["red"])
+    return int(risk_scores(pressure, mileage, temp, code, seed)[0])
+
+
+def maintenance_savings(code, mileage):
+    """Maintenance cost avoided ($) per tire for twin.risk STATUS_* codes."""
+    end_of_life = np.asarray(mileage, dtype=np.float64) > HIGH_MILEAGE_THRESHOLD
+    return MAINTENANCE_SAVINGS[np.asarray(code, dtype=np.intp)] + END_OF_LIFE_SAVINGS * end_of_life
+
+
+def calculate_business_metrics(pressure, mileage, temp, status_color):
+    """REALISTIC business metrics calculations"""
+    
+    # FUEL EFFICIENCY (FIXED - over-inflation should improve efficiency initially)
+    fuel_efficiency_impact = 0
+    if pressure < OPTIMAL_PRESSURE_RANGE[0]:
+        # Under-inflation: 0.5% fuel loss per PSI under optimal
+        fuel_efficiency_impact = -((OPTIMAL_PRESSURE_RANGE[0] - pressure) * 0.5)
+    elif pressure > OPTIMAL_PRESSURE_RANGE[1]:
+        # Over-inflation: slight improvement up to a point, then negative
+        over_pressure = pressure - OPTIMAL_PRESSURE_RANGE[1]
+        if over_pressure <= 3:  # Slight over-inflation can improve efficiency
+            fuel_efficiency_impact = min(2.0, over_pressure * 0.7)
+        else:  # Extreme over-inflation reduces efficiency
+            fuel_efficiency_impact = 2.0 - ((over_pressure - 3) * 1.5)
+    
+    # Temperature impact on fuel efficiency
+    if temp > OPTIMAL_TEMP_RANGE[1]:
+        temp_impact = -((temp - OPTIMAL_TEMP_RANGE[1]) * 0.2)  # High temp reduces efficiency
+        fuel_efficiency_impact += temp_impact
+    
+    # MAINTENANCE COST SAVINGS (FIXED - realistic values)
+    if status_color == "green":
+        maintenance_savings = 1800  # $ - preventive maintenance savings
+        uptime = 98.2
+    elif status_color == "yellow":
+        maintenance_savings = 2400  # $ - early detection savings
+        uptime = 96.5
+    elif status_color == "orange":
+        maintenance_savings = 3600  # $ - avoiding major repairs
+        uptime = 94.0
+    else:  # red/critical
+        maintenance_savings = 4800  # $ - preventing catastrophic failure
+        uptime = 89.0
+    
+    # Deterministic risk score derived from the readings (reproducible)
+    risk_score = risk_score_for(pressure, mileage, temp, status_color)
+    
+    # Additional mileage impact
+    if mileage > HIGH_MILEAGE_THRESHOLD:
+        maintenance_savings += 800  # Additional savings from avoiding tire replacement
+        uptime -= 2.0
+    
+    return {
+        "uptime": round(uptime, 1),
+        "fuel_efficiency": round(fuel_efficiency_impact, 1),
+        "maintenance_savings": maintenance_savings,
+        "risk_score": risk_score
+    }
+
+
+def fuel_efficiency_impact(pressure, temp):
+    """Fuel efficiency impact (%) of pressure and temperature, unrounded."""
+    pressure = np.asarray(pressure, dtype=np.float64)
+    temp = np.asarray(temp, dtype=np.float64)
+
+    # Under-inflation: 0.5% fuel loss per PSI under optimal
+    under = -((OPTIMAL_PRESSURE_RANGE[0] - pressure) * 0.5)
+    # Over-inflation: slight improvement up to 3 PSI, then negative
+    over_pressure = pressure - OPTIMAL_PRESSURE_RANGE[1]
+    over = np.where(over_pressure <= 3, np.minimum(2.0, over_pressure * 0.7), 2.0 - ((over_pressure - 3) * 1.5))
+    impact = np.where(
+        pressure < OPTIMAL_PRESSURE_RANGE[0], under,
+        np.where(pressure > OPTIMAL_PRESSURE_RANGE[1], over, 0.0),
+    )
+
+    # High temperature reduces efficiency
+    return impact + np.where(temp > OPTIMAL_TEMP_RANGE[1], -((temp - OPTIMAL_TEMP_RANGE[1]) * 0.2), 0.0)
+
+
+def calculate_business_metrics_batch(pressure, mileage, temp, code=None, seed=0):
+    """Vectorized ``calculate_business_metrics`` over arrays of readings.
+
+    ``code`` holds twin.risk STATUS_* codes; when omitted they are computed
+    with the batch risk engine. Returns the same keys as the scalar function,
+    each mapped to an array.
+    """
+    pressure, mileage, temp = np.broadcast_arrays(
+        np.asarray(pressure, dtype=np.float64),
+        np.asarray(mileage, dtype=np.float64),
+        np.asarray(temp, dtype=np.float64),
+    )
+    if code is None:
+        code = risk_codes(pressure, mileage, temp)[0]
+    code = np.broadcast_to(np.asarray(code, dtype=np.intp), pressure.shape)
+
+    end_of_life = mileage > HIGH_MILEAGE_THRESHOLD
+    uptime = UPTIME[code] - END_OF_LIFE_UPTIME_LOSS * end_of_life
+
+    return {
+        "uptime": np.round(uptime, 1),
+        "fuel_efficiency": np.round(fuel_efficiency_impact(pressure, temp), 1),
+        "maintenance_savings": maintenance_savings(code, mileage),
+        "risk_score": risk_scores(pressure, mileage, temp, code, seed).reshape(pressure.shape),
+    }
+
+
+def summarize_fleet(metrics):
+    """Reproducible fleet totals from :func:`calculate_business_metrics_batch`."""
+    count = int(np.size(metrics["uptime"]))
+    if count == 0:
+        return {"tires": 0, "uptime": 0.0, "fuel_efficiency": 0.0, "maintenance_savings": 0, "risk_score": 0.0}
+    return {
+        "tires": count,
+        "uptime": round(float(np.mean(metrics["uptime"])), 1),
+        "fuel_efficiency": round(float(np.mean(metrics["fuel_efficiency"])), 1),
+        "maintenance_savings": int(np.sum(metrics["maintenance_savings"])),
+        "risk_score": round(float(np.mean(metrics["risk_score"])), 1),
+    }
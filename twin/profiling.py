@@ -0,0 +1,92 @@
+"""Opt-in timing of dashboard sections and engine calls.
+
+Wrap a hot path in ``with profiler.section("name"):``. While the profiler is
+enabled, each exit records the wall time into a bounded per-name window, so
+percentiles always describe the most recent reruns. When it is disabled,
+``section`` returns one shared no-op context manager and nothing is timed or
+stored.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+DEFAULT_WINDOW = 512
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+_DISABLED = nullcontext()
+
+
+class _Section:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Profiler:
+    """Rolling wall-time samples per section name, shared across sessions."""
+
+    def __init__(self, enabled=True, window=DEFAULT_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def section(self, name):
+        """Context manager timing ``name``; a shared no-op while disabled."""
+        if not self.enabled:
+            return _DISABLED
+        return _Section(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+                self._totals[name] = 0.0
+            samples.append(seconds)
+            self._counts[name] += 1
+            self._totals[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Per-section ``count`` and ``total_ms`` since the last reset, plus
+        ``mean_ms`` and ``p<q>_ms`` over the window."""
+        with self._lock:
+            snapshot = {name: (np.fromiter(samples, dtype=np.float64, count=len(samples)),
+                               self._counts[name], self._totals[name])
+                        for name, samples in self._samples.items()}
+        report = {}
+        for name, (samples, count, total) in sorted(snapshot.items()):
+            if not len(samples):
+                continue
+            values = np.percentile(samples, percentiles) * 1000
+            stats = {"count": count, "total_ms": round(total * 1000, 3), "window": len(samples),
+                     "mean_ms": round(float(samples.mean()) * 1000, 3)}
+            stats.update({f"p{q}_ms": round(float(v), 3) for q, v in zip(percentiles, values)})
+            report[name] = stats
+        return report
+
+    def to_json(self, percentiles=DEFAULT_PERCENTILES):
+        return json.dumps({"window": self.window, "sections": self.summary(percentiles)}, indent=2)
@@ -0,0 +1,152 @@
+"""Multi-resolution rollups of tire telemetry for long-range trend views.
+
+A tire's full life can hold hundreds of thousands of readings, but a chart
+can only show a few hundred distinct x positions. Rollups summarise readings
+into fixed buckets: 100 km, 1,000 km and calendar day (UTC). Each bucket
+keeps its count, its mileage and time extent, and the min, max and sum of
+pressure and temperature. Summaries of the same bucket combine by adding
+counts and sums and taking the min of minimums and the max of maximums.
+That is what lets :class:`twin.store.TelemetryStore` fold each batch of new
+readings into the stored rollups without ever recomputing them.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Resolution(NamedTuple):
+    name: str
+    column: str   # reading column that defines the bucket
+    size: float   # bucket width in that column's unit
+
+
+ROLLUPS = (
+    Resolution("100km", "mileage", 100.0),
+    Resolution("1000km", "mileage", 1000.0),
+    Resolution("day", "timestamp", 86400.0),
+)
+RESOLUTIONS = {resolution.name: resolution for resolution in ROLLUPS}
+
+# Aggregate row layout shared by the SQL table and the NumPy reducer
+AGGREGATE_COLUMNS = (
+    "bucket", "count",
+    "mileage_min", "mileage_max", "timestamp_min", "timestamp_max",
+    "pressure_min", "pressure_max", "pressure_sum",
+    "temperature_min", "temperature_max", "temperature_sum",
+)
+_SUM = ("count", "pressure_sum", "temperature_sum")
+_MIN = ("mileage_min", "timestamp_min", "pressure_min", "temperature_min")
+_MAX = ("mileage_max", "timestamp_max", "pressure_max", "temperature_max")
+
+
+class RollupWindow(NamedTuple):
+    """One tire's buckets, oldest first.
+
+    ``mileage``, ``pressure``, ``temperature`` and ``timestamp`` hold the
+    bucket's mid mileage, mean values and last timestamp, so code written
+    for :class:`twin.history.HistoryWindow` can plot either one.
+    """
+    mileage: np.ndarray
+    pressure: np.ndarray
+    temperature: np.ndarray
+    timestamp: np.ndarray
+    pressure_min: np.ndarray
+    pressure_max: np.ndarray
+    temperature_min: np.ndarray
+    temperature_max: np.ndarray
+    count: np.ndarray
+
+    def __len__(self):
+        return self.mileage.size
+
+
+def bucket_of(values, resolution):
+    """Bucket number of each value (readings are non-negative, so truncation is floor)."""
+    return np.trunc(np.asarray(values, dtype=np.float64) / resolution.size).astype(np.int64)
+
+
+def _reduce_sorted(tire_id, bucket, mileage, pressure, temperature, timestamp):
+    # Rows sorted so each (tire, bucket) is one contiguous run
+    n = tire_id.size
+    starts = np.flatnonzero(np.r_[True, (tire_id[1:] != tire_id[:-1]) | (bucket[1:] != bucket[:-1])])
+    return np.column_stack([
+        tire_id[starts], bucket[starts], np.diff(np.r_[starts, n]),
+        np.minimum.reduceat(mileage, starts), np.maximum.reduceat(mileage, starts),
+        np.minimum.reduceat(timestamp, starts), np.maximum.reduceat(timestamp, starts),
+        np.minimum.reduceat(pressure, starts), np.maximum.reduceat(pressure, starts),
+        np.add.reduceat(pressure, starts),
+        np.minimum.reduceat(temperature, starts), np.maximum.reduceat(temperature, starts),
+        np.add.reduceat(temperature, starts),
+    ]).astype(np.float64)
+
+
+def aggregate_readings(tire_id, mileage, pressure, temperature, timestamp):
+    """Aggregate raw readings at every resolution.
+
+    Returns ``{resolution name: rows}``; each row is the tire id followed by
+    ``AGGREGATE_COLUMNS``, sorted by tire and bucket. Readings are sorted
+    once by tire and mileage, which groups every mileage resolution (and
+    days too, as long as time runs forward with mileage).
+    """
+    tire_id = np.asarray(tire_id, dtype=np.int64).ravel()
+    mileage, pressure, temperature, timestamp = (np.asarray(a, dtype=np.float64).ravel()
+                                                 for a in (mileage, pressure, temperature, timestamp))
+    if tire_id.size == 0:
+        return {resolution.name: np.empty((0, len(AGGREGATE_COLUMNS) + 1)) for resolution in ROLLUPS}
+    order = np.lexsort((mileage, tire_id))
+    columns = tuple(column[order] for column in (tire_id, mileage, pressure, temperature, timestamp))
+    same_tire = columns[0][1:] == columns[0][:-1]
+    rollups = {}
+    for resolution in ROLLUPS:
+        tires, values = columns[0], columns
+        bucket = bucket_of(columns[1] if resolution.column == "mileage" else columns[4], resolution)
+        if np.any(same_tire & (bucket[1:] < bucket[:-1])):
+            regroup = np.lexsort((bucket, tires))
+            values, bucket = tuple(column[regroup] for column in columns), bucket[regroup]
+        rollups[resolution.name] = _reduce_sorted(values[0], bucket, *values[1:])
+    return rollups
+
+
+def combine(aggregates):
+    """Merge aggregate rows (``AGGREGATE_COLUMNS``) that share a bucket; result sorted by bucket."""
+    aggregates = np.asarray(aggregates, dtype=np.float64).reshape(-1, len(AGGREGATE_COLUMNS))
+    if aggregates.shape[0] == 0:
+        return aggregates
+    order = np.argsort(aggregates[:, 0], kind="stable")
+    columns = aggregates.T[:, order]
+    starts = np.flatnonzero(np.r_[True, columns[0, 1:] != columns[0, :-1]])
+    combined = np.empty((len(AGGREGATE_COLUMNS), starts.size))
+    combined[0] = columns[0, starts]
+    for names, ufunc in ((_SUM, np.add), (_MIN, np.minimum), (_MAX, np.maximum)):
+        for name in names:
+            column = AGGREGATE_COLUMNS.index(name)
+            combined[column] = ufunc.reduceat(columns[column], starts)
+    return combined.T
+
+
+def rollup_window(aggregates):
+    """:class:`RollupWindow` over combined aggregate rows."""
+    columns = dict(zip(AGGREGATE_COLUMNS, np.asarray(aggregates, dtype=np.float64).reshape(
+        -1, len(AGGREGATE_COLUMNS)).T))
+    count = columns["count"]
+    return RollupWindow(
+        mileage=(columns["mileage_min"] + columns["mileage_max"]) / 2,
+        pressure=columns["pressure_sum"] / np.maximum(count, 1),
+        temperature=columns["temperature_sum"] / np.maximum(count, 1),
+        timestamp=columns["timestamp_max"],
+        pressure_min=columns["pressure_min"],
+        pressure_max=columns["pressure_max"],
+        temperature_min=columns["temperature_min"],
+        temperature_max=columns["temperature_max"],
+        count=count.astype(np.int64),
+    )
+
+
+def choose_resolution(bucket_counts, min_buckets):
+    """Coarsest resolution with at least ``min_buckets`` buckets, else ``None`` (raw).
+
+    ``bucket_counts`` maps resolution names to the number of buckets the
+    requested window spans at that resolution.
+    """
+    filling = [(count, name) for name, count in bucket_counts.items() if count >= min_buckets]
+    return min(filling)[1] if filling else None
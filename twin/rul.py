@@ -0,0 +1,303 @@
+"""Remaining useful life: distance and time until a tire crosses a limit.
+
+Each tire's pressure and temperature are fitted as straight lines over
+mileage with recursive least squares (RLS) and a forgetting factor, so the
+fit follows the tire as its wear rate changes. The fit starts from the
+simulator's wear model (:func:`twin.simulation.expected_wear_rates`) as a
+prior and is refined by every reading in O(1): the line is kept anchored at
+the tire's latest mileage, and the 2×2 covariance is shared by both signals
+because they have the same regressor. RLS with forgetting is exponentially
+weighted least squares, so a tire's readings in a batch are folded in at
+once as weighted sums into the information form of the fit, however many
+there are. Forgetting applies per reading that advanced the odometer, so a
+parked tire keeps its slope, and readings with a non-finite value are
+skipped.
+
+The projection is the distance until the fitted lines reach
+``WEAR_THRESHOLD_PRESSURE`` or ``CRITICAL_TEMP_THRESHOLD``, or until the
+odometer reaches ``HIGH_MILEAGE_THRESHOLD``, whichever comes first. It is
+converted to hours with an EWMA of each tire's speed when readings carry
+timestamps.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from twin.anomaly import accumulate, carry_forward, ewma_scan, latest_valid, tire_blocks
+from twin.constants import CRITICAL_TEMP_THRESHOLD, HIGH_MILEAGE_THRESHOLD, WEAR_THRESHOLD_PRESSURE
+from twin.simulation import expected_wear_rates, simulate_tires
+
+# Which limit ends the tire's useful life first
+LIMIT_PRESSURE = 0
+LIMIT_TEMPERATURE = 1
+LIMIT_MILEAGE = 2
+LIMIT_NAMES = np.array(["pressure", "temperature", "mileage"], dtype=object)
+LIMIT_LABELS = np.array([
+    f"pressure reaches {WEAR_THRESHOLD_PRESSURE} PSI",
+    f"temperature reaches {CRITICAL_TEMP_THRESHOLD}°C",
+    f"mileage reaches {HIGH_MILEAGE_THRESHOLD:,} km",
+], dtype=object)
+
+FORGETTING = 0.98             # per reading that moved; about 50 readings of memory
+PRIOR_LEVEL_VARIANCE = 1.0    # relative to measurement noise
+PRIOR_SLOPE_VARIANCE = 1.0    # per (1,000 km)², relative to measurement noise
+SPEED_ALPHA = 0.2
+
+
+class RemainingLife(NamedTuple):
+    """Projected distance (km) and time (h) to each limit; ``inf`` if never reached."""
+    km: np.ndarray              # to the first limit
+    hours: np.ndarray           # ``km`` at the tire's recent speed; NaN when unknown
+    limit: np.ndarray           # LIMIT_* of the first limit
+    pressure_km: np.ndarray
+    temperature_km: np.ndarray
+    mileage_km: np.ndarray
+
+
+def _km_until(level, rate, threshold, falling):
+    """km until ``level`` moving at ``rate`` per 1,000 km crosses ``threshold``."""
+    crossed = level < threshold if falling else level > threshold
+    approaching = rate < 0 if falling else rate > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        km = np.where(approaching, (threshold - level) / rate * 1000.0, np.inf)
+    return np.where(crossed, 0.0, km)
+
+
+def remaining_life(pressure, pressure_rate, temperature, temperature_rate, mileage, speed_kmh=np.nan):
+    """Project constant rates (per 1,000 km) from the current state to the limits."""
+    pressure_km = _km_until(np.asarray(pressure, dtype=np.float64), pressure_rate,
+                            WEAR_THRESHOLD_PRESSURE, falling=True)
+    temperature_km = _km_until(np.asarray(temperature, dtype=np.float64), temperature_rate,
+                               CRITICAL_TEMP_THRESHOLD, falling=False)
+    mileage_km = np.maximum(HIGH_MILEAGE_THRESHOLD - np.asarray(mileage, dtype=np.float64), 0.0)
+
+    stacked = np.stack(np.broadcast_arrays(pressure_km, temperature_km, mileage_km))
+    limit = stacked.argmin(axis=0).astype(np.uint8)
+    km = stacked.min(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hours = np.where(np.asarray(speed_kmh) > 0, km / speed_kmh, np.nan)
+    return RemainingLife(km, hours, limit, *stacked)
+
+
+def project_remaining_life(pressure, mileage, temperature):
+    """Remaining life from a single reading, at the wear model's expected rates."""
+    pressure_rate, temperature_rate = expected_wear_rates(pressure, mileage)
+    return remaining_life(pressure, pressure_rate, temperature, temperature_rate, mileage)
+
+
+class RemainingLifeEstimator:
+    """Per-tire RLS fits of pressure and temperature over mileage."""
+
+    def __init__(self, max_tires=65536, forgetting=FORGETTING):
+        self.max_tires = max_tires
+        self.forgetting = forgetting
+
+        self.samples = np.zeros(max_tires, dtype=np.uint32)
+        self.mileage = np.full(max_tires, np.nan)           # km of the latest reading
+        self.timestamp = np.full(max_tires, np.nan)         # latest timestamp seen
+        self.timed_mileage = np.full(max_tires, np.nan)     # km when ``timestamp`` was last seen
+        self.speed_kmh = np.full(max_tires, np.nan)         # EWMA
+        # Fitted lines, anchored at the latest mileage (rates per 1,000 km)
+        self.pressure = np.full(max_tires, np.nan)
+        self.pressure_rate = np.zeros(max_tires)
+        self.temperature = np.full(max_tires, np.nan)
+        self.temperature_rate = np.zeros(max_tires)
+        # Shared covariance [[p00, p01], [p01, p11]]
+        self.p00 = np.zeros(max_tires)
+        self.p01 = np.zeros(max_tires)
+        self.p11 = np.zeros(max_tires)
+
+    def reset(self, tire_id):
+        """Forget one tire or an array of tires (e.g. after a tire change)."""
+        for column in (self.mileage, self.timestamp, self.timed_mileage, self.speed_kmh, self.pressure,
+                       self.temperature):
+            column[tire_id] = np.nan
+        for column in (self.samples, self.pressure_rate, self.temperature_rate, self.p00, self.p01, self.p11):
+            column[tire_id] = 0
+
+    def update(self, tire_id, pressure, temperature, mileage, timestamp=np.nan):
+        """Feed readings in arrival order; tire ids must be below ``max_tires``.
+
+        Readings with a non-finite pressure, temperature or mileage are
+        skipped; a NaN timestamp only leaves the speed alone.
+        """
+        tire_id, pressure, temperature, mileage, timestamp = (a.ravel() for a in np.broadcast_arrays(
+            np.asarray(tire_id, dtype=np.intp),
+            np.asarray(pressure, dtype=np.float64),
+            np.asarray(temperature, dtype=np.float64),
+            np.asarray(mileage, dtype=np.float64),
+            np.asarray(timestamp, dtype=np.float64),
+        ))
+        finite = np.isfinite(pressure) & np.isfinite(temperature) & np.isfinite(mileage)
+        tire_id, pressure, temperature, mileage, timestamp = (
+            a[finite] for a in (tire_id, pressure, temperature, mileage, timestamp))
+        if tire_id.size == 0:
+            return
+
+        # Readings often share a timestamp (a batch is stamped once on arrival), so speed
+        # is measured at the last reading of each run of equal timestamps per tire
+        order = np.argsort(tire_id, kind="stable")
+        ids, times = tire_id[order], timestamp[order]
+        stamped_at = np.where(np.isnan(times), ids.size, np.arange(ids.size))
+        following = np.append(np.minimum.accumulate(stamped_at[::-1])[::-1][1:], ids.size)
+        found = following < ids.size
+        following = np.minimum(following, ids.size - 1)
+        next_time = np.where(found & (ids[following] == ids), times[following], np.nan)
+        run_end = np.empty(ids.size, dtype=bool)
+        run_end[order] = ~np.isnan(times) & (next_time != times)
+
+        for grid in tire_blocks(tire_id):
+            rows = np.maximum(grid, 0)
+            valid = grid >= 0
+            self._fold(tire_id[rows[0]], pressure[rows], temperature[rows], mileage[rows], timestamp[rows],
+                       valid, valid & run_end[rows])
+
+    def _fold(self, tires, pressure, temperature, mileage, timestamp, valid, run_end):
+        """Apply a (readings × tires) grid, one column per tire, where ``valid`` marks real readings
+        and ``run_end`` the last reading of each run of equal timestamps."""
+        new = self.samples[tires] == 0
+        if new.any():
+            # A new tire's first reading only sets the prior
+            self._start(tires[new], pressure[0, new], temperature[0, new], mileage[0, new], timestamp[0, new])
+            valid, run_end = valid.copy(), run_end.copy()
+            valid[0, new] = run_end[0, new] = False
+        busy = valid.any(axis=0)
+        if not busy.all():
+            tires, pressure, temperature, mileage, timestamp, valid, run_end = (
+                a[..., busy] for a in (tires, pressure, temperature, mileage, timestamp, valid, run_end))
+        if tires.size == 0:
+            return
+
+        # Readings that do not advance the odometer are taken at the anchor
+        start = self.mileage[tires][None, :]
+        anchor = np.maximum(accumulate(np.maximum, np.where(valid, mileage, -np.inf)), start)
+        distance = anchor - np.concatenate((start, anchor[:-1]), axis=0)
+        moved = valid & (distance > 0)
+        dx = (anchor - start) / 1000.0
+
+        # Information form at the starting anchor: A = P⁻¹, b = A θ, each
+        # reading weighted by the forgetting of the moves after it
+        moves = moved.sum(axis=0)
+        moves_after = moves[None, :] - accumulate(np.add, moved.astype(np.int64))
+        weight = np.where(valid, self.forgetting ** moves_after, 0.0)
+        decay = self.forgetting ** moves
+        p00, p01, p11 = self.p00[tires], self.p01[tires], self.p11[tires]
+        determinant = p00 * p11 - p01 * p01
+        a00, a01, a11 = p11 / determinant, -p01 / determinant, p00 / determinant
+        wdx = weight * dx
+        s00 = decay * a00 + weight.sum(axis=0)
+        s01 = decay * a01 + wdx.sum(axis=0)
+        s11 = decay * a11 + (wdx * dx).sum(axis=0)
+        determinant = s00 * s11 - s01 * s01
+
+        def refit(level, rate, values):
+            values = np.where(valid, values, 0.0)
+            b0 = decay * (a00 * level + a01 * rate) + (weight * values).sum(axis=0)
+            b1 = decay * (a01 * level + a11 * rate) + (wdx * values).sum(axis=0)
+            return (s11 * b0 - s01 * b1) / determinant, (s00 * b1 - s01 * b0) / determinant
+
+        pressure_level, pressure_rate = refit(self.pressure[tires], self.pressure_rate[tires], pressure)
+        temperature_level, temperature_rate = refit(self.temperature[tires], self.temperature_rate[tires],
+                                                    temperature)
+        p00, p01, p11 = s11 / determinant, -s01 / determinant, s00 / determinant
+
+        # Move the anchor to the latest mileage: level += rate * dx, P -> T P Tᵀ
+        dx = dx[-1]
+        pressure_level += pressure_rate * dx
+        temperature_level += temperature_rate * dx
+        p00 = p00 + 2 * dx * p01 + dx * dx * p11
+        p01 = p01 + dx * p11
+
+        # Speed at the end of each run of equal timestamps, over the km covered since the
+        # end of the previous run
+        ends = latest_valid(run_end)
+        previous_time = carry_forward(ends, timestamp, self.timestamp[tires])
+        previous_mileage = carry_forward(ends, anchor, self.timed_mileage[tires])
+        elapsed_hours = (timestamp - previous_time) / 3600.0
+        travelled = anchor - previous_mileage
+        timed = run_end & (elapsed_hours > 0) & (travelled > 0)
+        instant = np.where(timed, travelled / np.where(timed, elapsed_hours, 1.0), 0.0)
+        speed = ewma_scan(self.speed_kmh[tires], np.where(timed, SPEED_ALPHA, 0.0), instant)[-1]
+        latest_time = np.where(run_end[-1], timestamp[-1], previous_time[-1])
+        latest_timed_mileage = np.where(run_end[-1], anchor[-1], previous_mileage[-1])
+
+        self.samples[tires] += valid.sum(axis=0).astype(np.uint32)
+        self.mileage[tires] = anchor[-1]
+        self.timestamp[tires] = latest_time
+        self.timed_mileage[tires] = latest_timed_mileage
+        self.speed_kmh[tires] = speed
+        self.pressure[tires] = pressure_level
+        self.pressure_rate[tires] = pressure_rate
+        self.temperature[tires] = temperature_level
+        self.temperature_rate[tires] = temperature_rate
+        self.p00[tires], self.p01[tires], self.p11[tires] = p00, p01, p11
+
+    def _start(self, tires, pressure, temperature, mileage, timestamp):
+        """First reading: the wear model's rates are the prior."""
+        pressure_rate, temperature_rate = expected_wear_rates(pressure, mileage)
+        self.samples[tires] = 1
+        self.mileage[tires] = mileage
+        self.timestamp[tires] = timestamp
+        self.timed_mileage[tires] = mileage
+        self.pressure[tires] = pressure
+        self.pressure_rate[tires] = pressure_rate
+        self.temperature[tires] = temperature
+        self.temperature_rate[tires] = temperature_rate
+        self.p00[tires] = PRIOR_LEVEL_VARIANCE
+        self.p01[tires] = 0.0
+        self.p11[tires] = PRIOR_SLOPE_VARIANCE
+
+    def estimate(self, tire_id=None):
+        """:class:`RemainingLife` for the given tires (all reporting tires by default)."""
+        if tire_id is None:
+            tire_id = np.flatnonzero(self.samples)
+        return remaining_life(self.pressure[tire_id], self.pressure_rate[tire_id],
+                              self.temperature[tire_id], self.temperature_rate[tire_id],
+                              self.mileage[tire_id], self.speed_kmh[tire_id])
+
+
+def replay_history(estimator, result, readings=None):
+    """Feed a :class:`twin.simulation.SimulationResult` history into ``estimator``.
+
+    Tire ``i`` of the result is tire id ``i``. ``readings`` optionally limits
+    how many intervals of each tire are fed (e.g. to observe a fleet at
+    different ages); by default every recorded interval is.
+    """
+    if result.mileage_history is None:
+        raise ValueError("simulation was run with keep_history=False")
+    readings = result.lengths if readings is None else np.minimum(readings, result.lengths)
+    for step in range(int(readings.max(initial=0))):
+        tires = np.flatnonzero(readings > step)
+        estimator.update(tires, result.pressure_history[step, tires], result.temperature_history[step, tires],
+                         result.mileage_history[step, tires])
+    return estimator
+
+
+def simulated_fleet_remaining_life(n_tires=1000, seed=0):
+    """Remaining life of a simulated fleet observed at random points in service.
+
+    Each simulated tire is observed after a random number of readings taken
+    before it first crossed a limit, as a stand-in fleet when no live data
+    is streaming.
+    """
+    result = simulate_tires(n_tires, seed=seed)
+    crossed = ((result.pressure_history < WEAR_THRESHOLD_PRESSURE)
+               | (result.temperature_history > CRITICAL_TEMP_THRESHOLD)
+               | (result.mileage_history > HIGH_MILEAGE_THRESHOLD))
+    in_service = np.where(crossed.any(axis=0), crossed.argmax(axis=0), result.lengths)
+    readings = np.random.default_rng(seed).integers(1, np.maximum(in_service, 1) + 1)
+    return replay_history(RemainingLifeEstimator(n_tires), result, readings).estimate()
+
+
+def median_time_to_limit(remaining):
+    """Fleet median ``(hours, km)`` of a :class:`RemainingLife`.
+
+    ``hours`` is NaN unless at least half the tires have a known speed.
+    """
+    km = np.asarray(remaining.km, dtype=np.float64).ravel()
+    hours = np.asarray(remaining.hours, dtype=np.float64).ravel()
+    if km.size == 0:
+        return float("nan"), float("nan")
+    timed = np.isfinite(hours)
+    median_hours = float(np.median(hours[timed])) if 2 * timed.sum() >= km.size else float("nan")
+    return median_hours, float(np.median(km))
@@ -0,0 +1,205 @@
+"""Command-line batch scorer for telemetry dumps.
+
+Usage::
+
+    python -m twin.score telemetry.csv --rows scored.csv --summary tires.csv
+
+Input is CSV or Parquet with ``tire_id``, ``timestamp``, ``mileage``,
+``pressure`` and ``temperature`` columns. The file is streamed in chunks that
+are scored in a process pool with the same rules as
+``predict_wear_and_status`` and ``calculate_business_metrics``. Per-row
+results are written as chunks complete (in input order), and per-tire
+summaries are folded in incrementally, so memory depends on the chunk size,
+worker count and number of tires, never on the file size.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from twin.lut import default_lut
+from twin.metrics import calculate_business_metrics_batch
+from twin.risk import STATUS_COLORS, STATUS_TEXTS, risk_codes
+
+INPUT_COLUMNS = ["tire_id", "timestamp", "mileage", "pressure", "temperature"]
+DEFAULT_CHUNK_ROWS = 250_000
+
+_SUMMARY_AGGREGATIONS = {
+    "readings": ("readings", "sum"),
+    "first_timestamp": ("first_timestamp", "min"),
+    "last_timestamp": ("last_timestamp", "max"),
+    "last_mileage": ("last_mileage", "last"),
+    "last_pressure": ("last_pressure", "last"),
+    "last_temperature": ("last_temperature", "last"),
+    "last_code": ("last_code", "last"),
+    "worst_code": ("worst_code", "max"),
+    "critical_readings": ("critical_readings", "sum"),
+    "min_pressure": ("min_pressure", "min"),
+    "max_temperature": ("max_temperature", "max"),
+    "risk_score_sum": ("risk_score_sum", "sum"),
+}
+
+
+def _is_parquet(path):
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield DataFrames of at most ``chunk_rows`` input rows."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=INPUT_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=INPUT_COLUMNS, chunksize=chunk_rows)
+
+
+def _fold(frame):
+    """Collapse per-tire partial summaries (rows sorted oldest first)."""
+    return (frame.sort_values("last_timestamp", kind="stable")
+                 .groupby("tire_id", sort=False)
+                 .agg(**_SUMMARY_AGGREGATIONS))
+
+
+def score_chunk(chunk, use_lut=False):
+    """Score one chunk; returns the scored rows and its per-tire partial summary."""
+    if use_lut:
+        code, critical_issues = default_lut().lookup(chunk["pressure"], chunk["mileage"], chunk["temperature"])
+    else:
+        code, critical_issues, _ = risk_codes(chunk["pressure"], chunk["mileage"], chunk["temperature"])
+    metrics = calculate_business_metrics_batch(chunk["pressure"], chunk["mileage"], chunk["temperature"], code=code)
+
+    rows = chunk.assign(
+        status=STATUS_TEXTS[code],
+        status_color=STATUS_COLORS[code],
+        critical_issues=critical_issues,
+        **metrics,
+    )
+
+    timestamp = chunk["timestamp"]
+    if not pd.api.types.is_numeric_dtype(timestamp):
+        timestamp = pd.to_datetime(timestamp)
+    partial = _fold(pd.DataFrame({
+        "tire_id": chunk["tire_id"].to_numpy(),
+        "readings": 1,
+        "first_timestamp": timestamp.to_numpy(),
+        "last_timestamp": timestamp.to_numpy(),
+        "last_mileage": chunk["mileage"].to_numpy(),
+        "last_pressure": chunk["pressure"].to_numpy(),
+        "last_temperature": chunk["temperature"].to_numpy(),
+        "last_code": code,
+        "worst_code": code,
+        "critical_readings": (code >= 3).astype(np.int64),
+        "min_pressure": chunk["pressure"].to_numpy(),
+        "max_temperature": chunk["temperature"].to_numpy(),
+        "risk_score_sum": metrics["risk_score"],
+    }))
+    return rows, partial
+
+
+class _RowWriter:
+    """Append scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, rows):
+        if self.path is None:
+            return
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            rows.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def finish_summary(summary):
+    """Turn folded partials into the per-tire report."""
+    summary = summary.sort_index()
+    summary["mean_risk_score"] = (summary.pop("risk_score_sum") / summary["readings"]).round(1)
+    summary["last_status"] = STATUS_TEXTS[summary["last_code"].to_numpy(dtype=np.intp)]
+    summary["last_status_color"] = STATUS_COLORS[summary["last_code"].to_numpy(dtype=np.intp)]
+    summary["worst_status"] = STATUS_TEXTS[summary["worst_code"].to_numpy(dtype=np.intp)]
+    return summary.reset_index()
+
+
+def score_file(path, rows_path=None, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None, use_lut=False):
+    """Score ``path`` and return the per-tire summary DataFrame."""
+    workers = workers or os.cpu_count() or 1
+    writer = _RowWriter(rows_path)
+    summary = None
+
+    def consume(result):
+        nonlocal summary
+        rows, partial = result
+        writer.write(rows)
+        summary = partial if summary is None else _fold(pd.concat([summary, partial]).reset_index())
+
+    try:
+        if workers == 1:
+            for chunk in iter_chunks(path, chunk_rows):
+                consume(score_chunk(chunk, use_lut))
+        else:
+            # Bound the chunks in flight so memory does not grow with the input
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in iter_chunks(path, chunk_rows):
+                    pending.append(pool.submit(score_chunk, chunk, use_lut))
+                    if len(pending) >= 2 * workers:
+                        consume(pending.popleft().result())
+                while pending:
+                    consume(pending.popleft().result())
+    finally:
+        writer.close()
+
+    if summary is None:
+        # No chunks at all (e.g. a Parquet file without row groups): summarize an empty
+        # chunk, so the report has the same columns and dtypes as a non-empty one
+        empty = pd.DataFrame({column: pd.Series(dtype=np.int64 if column == "tire_id" else np.float64)
+                              for column in INPUT_COLUMNS})
+        summary = score_chunk(empty)[1]
+    return finish_summary(summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m twin.score", description="Score telemetry files offline.")
+    parser.add_argument("input", help="CSV or Parquet file with columns " + ", ".join(INPUT_COLUMNS))
+    parser.add_argument("--rows", help="write per-row status and metrics here (.csv or .parquet)")
+    parser.add_argument("--summary", help="write per-tire summaries here (.csv or .parquet); default stdout")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--lut", action="store_true",
+                        help="classify on-grid readings with the precomputed lookup table (see twin/lut.py)")
+    args = parser.parse_args(argv)
+
+    summary = score_file(args.input, args.rows, args.chunk_rows, args.workers, args.lut)
+    if args.summary is None:
+        summary.to_csv(sys.stdout, index=False)
+    elif _is_parquet(args.summary):
+        summary.to_parquet(args.summary, index=False)
+    else:
+        summary.to_csv(args.summary, index=False)
+
+
+if __name__ == "__main__":
+    main()
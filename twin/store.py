@@ -0,0 +1,336 @@
+"""Persistent telemetry history in a local SQLite database.
+
+:class:`twin.history.HistoryStore` keeps only the newest readings per tire and
+loses them on restart. :class:`TelemetryStore` keeps every reading on disk.
+The database runs in WAL mode, so the telemetry consumer can write while
+dashboard reruns read.
+
+Readings from a live fleet arrive in random tire order, and inserting them
+straight into an index costs a B-tree seek per row. Writes therefore go in
+two steps:
+
+* each batch is appended with one ``executemany`` to ``staging``, an
+  unindexed heap;
+* every ``merge_rows`` readings, staging is moved into ``readings`` in
+  ``(tire_id, mileage, timestamp)`` order. ``readings`` is a ``WITHOUT
+  ROWID`` table clustered on that key.
+
+A tire's history is one contiguous key range, so range queries are index
+scans: a mileage range seeks straight to its rows, while a time range scans
+the tire's whole key range and filters on timestamp. There is deliberately
+no ``(tire_id, timestamp)`` index, which every merge would have to maintain.
+Range queries also read the small staging table, and return
+:class:`twin.history.HistoryWindow` columns, the same shape the ring buffer
+serves.
+
+Each merge also aggregates the staged readings in NumPy for every
+resolution in :data:`twin.rollup.ROLLUPS`. It upserts the summaries into the
+``rollups`` table, in the same transaction that moves the readings. Rollups
+therefore grow with the data and are never rebuilt.
+:meth:`trend_window` serves the coarsest resolution that still fills a
+chart.
+"""
+import sqlite3
+import threading
+
+import numpy as np
+
+from twin.history import HistoryWindow
+from twin.rollup import (
+    AGGREGATE_COLUMNS,
+    RESOLUTIONS,
+    ROLLUPS,
+    aggregate_readings,
+    bucket_of,
+    choose_resolution,
+    combine,
+    rollup_window,
+)
+
+DEFAULT_MERGE_ROWS = 262_144
+CACHE_KIB = 65_536
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    tire_id     INTEGER NOT NULL,
+    mileage     REAL    NOT NULL,  -- km
+    timestamp   REAL    NOT NULL,  -- seconds since the epoch
+    pressure    REAL    NOT NULL,  -- PSI
+    temperature REAL    NOT NULL,  -- °C
+    PRIMARY KEY (tire_id, mileage, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS staging (
+    tire_id     INTEGER NOT NULL,
+    mileage     REAL    NOT NULL,
+    timestamp   REAL    NOT NULL,
+    pressure    REAL    NOT NULL,
+    temperature REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    tire_id         INTEGER NOT NULL,
+    resolution      TEXT    NOT NULL,  -- twin.rollup.Resolution.name
+    bucket          INTEGER NOT NULL,
+    count           INTEGER NOT NULL,
+    mileage_min     REAL    NOT NULL,
+    mileage_max     REAL    NOT NULL,
+    timestamp_min   REAL    NOT NULL,
+    timestamp_max   REAL    NOT NULL,
+    pressure_min    REAL    NOT NULL,
+    pressure_max    REAL    NOT NULL,
+    pressure_sum    REAL    NOT NULL,
+    temperature_min REAL    NOT NULL,
+    temperature_max REAL    NOT NULL,
+    temperature_sum REAL    NOT NULL,
+    PRIMARY KEY (tire_id, resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "tire_id, mileage, timestamp, pressure, temperature"
+_WINDOW_COLUMNS = "mileage, pressure, temperature, timestamp"  # HistoryWindow field order
+_MERGE = (f"INSERT OR REPLACE INTO readings ({_COLUMNS}) "
+          f"SELECT {_COLUMNS} FROM staging ORDER BY tire_id, mileage, timestamp")
+_AGGREGATES = ", ".join(AGGREGATE_COLUMNS)
+
+_ROLLUP_UPSERT = (
+    f"INSERT INTO rollups (tire_id, {_AGGREGATES}, resolution) VALUES ({', '.join('?' * 14)}) "
+    "ON CONFLICT (tire_id, resolution, bucket) DO UPDATE SET "
+    "count = count + excluded.count, "
+    "mileage_min = min(mileage_min, excluded.mileage_min), "
+    "mileage_max = max(mileage_max, excluded.mileage_max), "
+    "timestamp_min = min(timestamp_min, excluded.timestamp_min), "
+    "timestamp_max = max(timestamp_max, excluded.timestamp_max), "
+    "pressure_min = min(pressure_min, excluded.pressure_min), "
+    "pressure_max = max(pressure_max, excluded.pressure_max), "
+    "pressure_sum = pressure_sum + excluded.pressure_sum, "
+    "temperature_min = min(temperature_min, excluded.temperature_min), "
+    "temperature_max = max(temperature_max, excluded.temperature_max), "
+    "temperature_sum = temperature_sum + excluded.temperature_sum"
+)
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; a crash may lose the last commits
+    connection.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    return connection
+
+
+def _sorted_window(rows, column):
+    if not rows:
+        return HistoryWindow(*(np.empty(0) for _ in range(4)))
+    values = np.array(rows, dtype=np.float64)
+    key = HistoryWindow._fields.index(column)
+    tie = HistoryWindow._fields.index("mileage" if column == "timestamp" else "timestamp")
+    values = values[np.lexsort((values[:, tie], values[:, key]))]
+    return HistoryWindow(*values.T)
+
+
+class TelemetryStore:
+    """Append-only reading history in the SQLite file at ``path``.
+
+    One connection writes and one reads, each behind its own lock, so the
+    store can be shared between the ingest thread and Streamlit reruns.
+    Readings with the same tire, mileage and timestamp are stored once
+    (rollups count each copy); readings with a NaN or infinite value are
+    skipped and counted in ``skipped_readings``.
+    """
+
+    def __init__(self, path, merge_rows=DEFAULT_MERGE_ROWS):
+        self.path = str(path)
+        self.merge_rows = merge_rows
+        self._writer = _connect(self.path)
+        self._writer.executescript(SCHEMA)
+        self._reader = _connect(self.path)
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self.skipped_readings = 0
+        # Staged readings as arrays (``_COLUMNS`` order), rolled up at the next merge
+        staged = np.array(self._writer.execute(f"SELECT {_COLUMNS} FROM staging").fetchall(),
+                          dtype=np.float64).reshape(-1, 5)
+        self._staged = staged.shape[0]
+        self._pending = [tuple(staged.T)]
+
+    def close(self):
+        self.flush()
+        with self._write_lock, self._read_lock:
+            self._writer.close()
+            self._reader.close()
+
+    # --- writes ---
+    def _transaction(self, *statements):
+        self._writer.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                if params is None:
+                    self._writer.execute(sql)
+                else:
+                    self._writer.executemany(sql, params)
+        except BaseException:
+            self._writer.execute("ROLLBACK")
+            raise
+        self._writer.execute("COMMIT")
+
+    def append_batch(self, tire_id, mileage, pressure, temperature, timestamp):
+        """Insert a batch of readings (same signature as ``HistoryStore.append_batch``)."""
+        columns = np.broadcast_arrays(
+            np.asarray(tire_id, dtype=np.int64),
+            np.asarray(mileage, dtype=np.float64),
+            np.asarray(timestamp, dtype=np.float64),
+            np.asarray(pressure, dtype=np.float64),
+            np.asarray(temperature, dtype=np.float64),
+        )
+        columns = tuple(column.ravel() for column in columns)
+        finite = np.logical_and.reduce([np.isfinite(column) for column in columns[1:]])
+        if not finite.all():
+            self.skipped_readings += int((~finite).sum())
+            columns = tuple(column[finite] for column in columns)
+        n = columns[0].size
+        if n == 0:
+            return
+        rows = zip(*(column.tolist() for column in columns))
+        with self._write_lock:
+            self._transaction((f"INSERT INTO staging ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)", rows))
+            self._staged += n
+            self._pending.append(columns)
+            if self._staged >= self.merge_rows:
+                self._merge()
+
+    def _merge(self):
+        tire_id, mileage, timestamp, pressure, temperature = (np.concatenate(parts) for parts in zip(*self._pending))
+        upserts = [(_ROLLUP_UPSERT, [row + [name] for row in aggregates.tolist()])
+                   for name, aggregates in aggregate_readings(tire_id, mileage, pressure, temperature,
+                                                              timestamp).items()]
+        self._transaction(*upserts, (_MERGE, None), ("DELETE FROM staging", None))
+        self._staged = 0
+        self._pending = []
+
+    def flush(self):
+        """Move staged readings into the clustered table now."""
+        with self._write_lock:
+            if self._staged:
+                self._merge()
+
+    # --- reads ---
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def _range(self, tire_id, column, start, end):
+        """Rows of one tire with ``start <= column <= end``, sorted by that column."""
+        tire_id = int(tire_id)
+        with self._read_lock:
+            merged = self._reader.execute(
+                f"SELECT {_WINDOW_COLUMNS} FROM readings WHERE tire_id = ? AND {column} BETWEEN ? AND ?",
+                (tire_id, float(start), float(end))).fetchall()
+            staged = self._reader.execute(
+                f"SELECT {_WINDOW_COLUMNS} FROM staging WHERE tire_id = ? AND {column} BETWEEN ? AND ?",
+                (tire_id, float(start), float(end))).fetchall()
+        return _sorted_window(merged + staged, column)
+
+    def __len__(self):
+        return self._query("SELECT (SELECT count(*) FROM readings) + (SELECT count(*) FROM staging)")[0][0]
+
+    def tires(self):
+        """Ids of all tires with stored readings, ascending."""
+        rows = self._query("SELECT DISTINCT tire_id FROM readings UNION SELECT DISTINCT tire_id FROM staging")
+        return np.sort(np.array([row[0] for row in rows], dtype=np.int64))
+
+    def latest_mileage(self, tire_id):
+        """Highest recorded mileage of a tire, or ``None`` without history."""
+        return self._query("SELECT max(mileage) FROM (SELECT max(mileage) AS mileage FROM readings WHERE tire_id = ?"
+                           " UNION ALL SELECT max(mileage) FROM staging WHERE tire_id = ?)",
+                           (int(tire_id),) * 2)[0][0]
+
+    def mileage_range(self, tire_id, start_km=-np.inf, end_km=np.inf):
+        """Readings with ``start_km <= mileage <= end_km``, ordered by mileage."""
+        return self._range(tire_id, "mileage", start_km, end_km)
+
+    def time_range(self, tire_id, start=-np.inf, end=np.inf):
+        """Readings with ``start <= timestamp <= end``, ordered by time.
+
+        The key is ``(tire_id, mileage, timestamp)``, so this scans every
+        stored reading of the tire; prefer :meth:`mileage_range` for long
+        histories.
+        """
+        return self._range(tire_id, "timestamp", start, end)
+
+    def _staged_rows(self, tire_id):
+        # Caller holds the read lock; one pass over the unindexed staging table
+        return self._reader.execute(
+            f"SELECT {_WINDOW_COLUMNS} FROM staging WHERE tire_id = ?", (tire_id,)).fetchall()
+
+    def _start_of_last_km(self, tire_id, staged, km):
+        # Caller holds the read lock; None when the tire has no readings
+        latest = self._reader.execute(
+            "SELECT max(mileage) FROM readings WHERE tire_id = ?", (tire_id,)).fetchone()[0]
+        latest = max([row[0] for row in staged] + ([] if latest is None else [latest]), default=None)
+        return None if latest is None else latest - km
+
+    def _raw_since(self, tire_id, staged, start):
+        # Caller holds the read lock
+        merged = self._reader.execute(
+            f"SELECT {_WINDOW_COLUMNS} FROM readings WHERE tire_id = ? AND mileage >= ?",
+            (tire_id, start)).fetchall()
+        return _sorted_window(merged + [row for row in staged if row[0] >= start], "mileage")
+
+    def last_km(self, tire_id, km):
+        """Readings over the tire's last ``km`` kilometres, like ``TireHistory.last_km``."""
+        tire_id = int(tire_id)
+        with self._read_lock:
+            staged = self._staged_rows(tire_id)
+            start = self._start_of_last_km(tire_id, staged, km)
+            if start is None:
+                return _sorted_window([], "mileage")
+            return self._raw_since(tire_id, staged, start)
+
+    def _rollup_since(self, tire_id, staged, resolution, start):
+        # Caller holds the read lock; stored buckets plus the staged readings folded in
+        stored = self._reader.execute(
+            f"SELECT {_AGGREGATES} FROM rollups WHERE tire_id = ? AND resolution = ? AND mileage_max >= ?",
+            (tire_id, resolution.name, start)).fetchall()
+        staged = np.array([row for row in staged if row[0] >= start], dtype=np.float64).reshape(-1, 4)
+        mileage, pressure, temperature, timestamp = staged.T
+        recent = aggregate_readings(np.full(mileage.size, tire_id), mileage, pressure, temperature, timestamp)
+        return rollup_window(combine(np.vstack([
+            np.array(stored, dtype=np.float64).reshape(-1, len(AGGREGATE_COLUMNS)),
+            recent[resolution.name][:, 1:],  # drop the tire id column
+        ])))
+
+    def rollup(self, tire_id, resolution, km=np.inf):
+        """One resolution's buckets over the tire's last ``km`` kilometres."""
+        tire_id = int(tire_id)
+        resolution = RESOLUTIONS[resolution]
+        with self._read_lock:
+            staged = self._staged_rows(tire_id)
+            start = self._start_of_last_km(tire_id, staged, km)
+            if start is None:
+                return rollup_window([])
+            return self._rollup_since(tire_id, staged, resolution, start)
+
+    def trend_window(self, tire_id, km, min_buckets):
+        """``(resolution name or None, window)`` for a chart of the last ``km`` km.
+
+        Picks the coarsest rollup that still has ``min_buckets`` buckets in
+        the window (a :class:`twin.rollup.RollupWindow`), else raw readings
+        (a :class:`twin.history.HistoryWindow`).
+        """
+        tire_id = int(tire_id)
+        with self._read_lock:
+            staged = self._staged_rows(tire_id)
+            start = self._start_of_last_km(tire_id, staged, km)
+            if start is None:
+                return None, _sorted_window([], "mileage")
+            counts = dict(self._reader.execute(
+                "SELECT resolution, count(*) FROM rollups WHERE tire_id = ? AND mileage_max >= ? "
+                "GROUP BY resolution", (tire_id, start)).fetchall())
+            recent = np.array([row for row in staged if row[0] >= start], dtype=np.float64).reshape(-1, 4)
+            for resolution in ROLLUPS:
+                # Staged buckets may repeat stored ones; close enough for choosing
+                column = recent[:, 0] if resolution.column == "mileage" else recent[:, 3]
+                counts[resolution.name] = counts.get(resolution.name, 0) + np.unique(
+                    bucket_of(column, resolution)).size
+            name = choose_resolution(counts, min_buckets)
+            if name is None:
+                return None, self._raw_since(tire_id, staged, start)
+            return name, self._rollup_since(tire_id, staged, RESOLUTIONS[name], start)
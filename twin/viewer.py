@@ -0,0 +1,79 @@
+"""Persistent 3D twin viewer component and the state it renders.
+
+``twin_viewer`` is a bidirectional Streamlit component (plain HTML and JS in
+``twin/frontend/twin_viewer``, no build step). Its iframe is created once
+per session and keyed, so reruns never reload model-viewer or the GLB or
+reset the camera. Each rerun passes the full viewer state (glow, material
+tints, highlighted part, annotations); the frontend compares it key by key
+with what it has already applied and touches only the keys that changed.
+Clicking a part of the model sends that part back to Python as the
+component's value.
+"""
+import functools
+from pathlib import Path
+
+FRONTEND_DIR = Path(__file__).resolve().parent / "frontend" / "twin_viewer"
+
+# Materials of the wheel meshes in the twin model (the bundled GLB has one tire mesh)
+TIRE_MATERIALS = ("M_Tiers_01",)
+
+# Base colour factors multiply the rubber texture, so they stay light enough
+# to keep the tread visible; the emissive term makes the hue read on black rubber
+STATUS_TINTS = {
+    "green": (0.60, 1.00, 0.70, 1.0),
+    "yellow": (1.00, 0.90, 0.40, 1.0),
+    "orange": (1.00, 0.60, 0.30, 1.0),
+    "red": (1.00, 0.35, 0.35, 1.0),
+}
+EMISSIVE_STRENGTH = 0.25
+STATUS_GLOWS = {
+    "green": "rgba(60, 179, 113, 0.6)",
+    "yellow": "rgba(255, 165, 0, 0.6)",
+    "orange": "rgba(255, 69, 0, 0.6)",
+    "red": "rgba(255, 0, 0, 0.6)",
+}
+DEFAULT_GLOW = "rgba(0, 0, 128, 0.6)"
+
+
+def viewer_state(tire_colors, highlight=None, annotations=()):
+    """Viewer state for ``tire_colors`` (``{material: status colour}``).
+
+    The container glow follows the worst colour present. ``highlight`` names
+    a material to emphasise; ``annotations`` are dicts with ``id`` and
+    ``text`` and optionally ``color``, ``position`` and ``normal`` in
+    model-viewer hotspot syntax (labels without a position stack above the
+    model).
+    """
+    severity = list(STATUS_TINTS)
+    worst = max(tire_colors.values(), key=lambda color: severity.index(color) if color in severity else -1,
+                default=None)
+    materials = {}
+    for material, color in tire_colors.items():
+        tint = STATUS_TINTS.get(color, (1.0, 1.0, 1.0, 1.0))
+        materials[material] = {
+            "baseColor": list(tint),
+            "emissive": [round(channel * EMISSIVE_STRENGTH, 3) for channel in tint[:3]],
+        }
+    return {
+        "glow": STATUS_GLOWS.get(worst, DEFAULT_GLOW),
+        "materials": materials,
+        "highlight": highlight,
+        "annotations": [dict(annotation) for annotation in annotations],
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _component():
+    import streamlit.components.v1 as components  # only the dashboard needs Streamlit
+
+    return components.declare_component("twin_viewer", path=str(FRONTEND_DIR))
+
+
+def twin_viewer(sources, state, height=280, key="twin_viewer"):
+    """Mount the viewer once and push ``state`` to it.
+
+    ``sources`` are :func:`twin.assets.viewer_sources` URLs (read only on
+    the first render). Returns the last part the user clicked, as
+    ``{"event": "select", "material", "position", "at"}``, or ``None``.
+    """
+    return _component()(sources=sources, state=state, height=height, key=key, default=None)